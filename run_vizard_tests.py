@@ -2,6 +2,10 @@
 
 import tests.test_experiment as test_experiment
 import tests.test_data as test_data
+import tests.test_stats as test_stats
+import tests.test_recorder as test_recorder
+import tests.test_replay as test_replay
+import tests.test_vrutil as test_vrutil
 
 print('Running unit tests from within Vizard environment...')
 
@@ -9,10 +13,16 @@ print('experiment')
 unittest.main(module=test_experiment, exit=False)
 
 print('data')
-unittest.main(module=test_data)
+unittest.main(module=test_data, exit=False)
+
+print('stats')
+unittest.main(module=test_stats, exit=False)
 
 print('recorder')
-unittest.main(module=test_recorder)
+unittest.main(module=test_recorder, exit=False)
 
 print('replay')
-unittest.main(module=test_replay)
+unittest.main(module=test_replay, exit=False)
+
+print('vrutil')
+unittest.main(module=test_vrutil)
@@ -1,8 +1,238 @@
 import unittest
 
+import os
+import pickle
+from tempfile import mkstemp
+
+import viz
+import vizshape
 from vexptoolbox.recorder import SampleRecorder
 
+
+class ViveProEyeTracker(object):
+    """ Minimal eye tracker providing monocular data, identified by class name """
+    def __init__(self):
+        self.pos = {viz.BOTH_EYE: 0.0, viz.LEFT_EYE: -0.03, viz.RIGHT_EYE: 0.03}
+
+    def getMatrix(self, flag=viz.BOTH_EYE):
+        m = viz.Matrix()
+        m.setPosition([self.pos[flag], 0.0, 0.0])
+        return m
+
+    def getPupilDiameter(self, eye):
+        return 3.0
+
+    def getEyeOpen(self, eye):
+        return 1.0
+
+
 class TestRecorder(unittest.TestCase):
-    pass
 
+    def _recorder(self, **kwargs):
+        """ Create a SampleRecorder with a single tracked node 'obj' """
+        rec = SampleRecorder(key_calibrate=None, key_preview=None, key_validate=None, **kwargs)
+        node = viz.addGroup()
+        rec.addTrackedNode(node, 'obj')
+        return rec, node
+
+
+    def _record(self, rec, node, positions):
+        """ Record one sample for each given X position of the tracked node """
+        rec.startRecording()
+        for x in positions:
+            node.setPosition([x, 0.0, 0.0])
+            rec.recordSample()
+        rec.stopRecording()
+
+
+    def test_record_samples(self):
+        rec, node = self._recorder()
+        self._record(rec, node, [0.0, 1.0, 2.0])
+        samples, events = rec.getLastRecording()
+        self.assertEqual(samples['obj_posX'], [0.0, 1.0, 2.0])
+        self.assertEqual(len(samples['time']), 3)
+        self.assertIn('obj_quatW', samples)
+        self.assertEqual(events['message'], ['REC_START', 'REC_STOP'])
+
+
+    def test_storage_growth(self):
+        rec, node = self._recorder(prealloc=2)
+        self._record(rec, node, [0.0, 1.0, 2.0, 3.0, 4.0])
+        samples, events = rec.getLastRecording()
+        self.assertEqual(samples['obj_posX'], [0.0, 1.0, 2.0, 3.0, 4.0])
+
+
+    def test_ring_buffer(self):
+        rec, node = self._recorder(ring_size=3)
+        self._record(rec, node, [0.0, 1.0, 2.0, 3.0, 4.0])
+        samples, events = rec.getLastRecording()
+        # Only the most recent samples are kept, oldest first
+        self.assertEqual(samples['obj_posX'], [2.0, 3.0, 4.0])
+
+        rec.clearRecording()
+        self._record(rec, node, [5.0, 6.0])
+        samples, events = rec.getLastRecording()
+        self.assertEqual(samples['obj_posX'], [5.0, 6.0])
+
+
+    def test_ring_buffer_field_removed(self):
+        rec, node = self._recorder(ring_size=3)
+        self._record(rec, node, [0.0, 1.0, 2.0, 3.0, 4.0])
+
+        # Continue without Quaternions after the buffer has wrapped
+        rec.startRecording(log_quat=False)
+        node.setPosition([5.0, 0.0, 0.0])
+        rec.recordSample()
+        rec.stopRecording()
+        samples, events = rec.getLastRecording()
+        self.assertEqual(samples['obj_posX'], [3.0, 4.0, 5.0])
+        self.assertEqual(samples['obj_quatW'], [rec.MISSING] * 3)
+
+
+    def test_quat_not_recorded(self):
+        rec, node = self._recorder()
+        rec.startRecording(log_quat=False)
+        rec.recordSample()
+        rec.stopRecording()
+        samples, events = rec.getLastRecording()
+        self.assertNotIn('obj_quatW', samples)
+        self.assertRaises(ValueError, rec.saveRecording, sample_file='unused.tsv', quat=True)
+
+
+    def test_val_samples_schema_change(self):
+        rec = SampleRecorder(eye_tracker=viz.addGroup(), key_calibrate=None, 
+                             key_preview=None, key_validate=None)
+        rec._clear_val_samples()
+        rec._record_val_sample()
+        rec._record_val_sample()
+
+        # Changing recorded fields during validation keeps validation data fields
+        rec.addTrackedNode(viz.addGroup(), 'obj')
+        s = rec._get_val_samples()
+        self.assertEqual(len(s), 2)
+        self.assertIn('gaze_posX', s[1])
+        self.assertIn('gazeVec_X', s[1])
+
+
+    def test_gaze3d_cursor_hidden(self):
+        rec = SampleRecorder(eye_tracker=viz.addGroup(), key_calibrate=None, 
+                             key_preview=None, key_validate=None)
+        viz.MainView.setPosition([0.0, 0.0, 0.0])
+        viz.MainView.setEuler([0.0, 0.0, 0.0])
+        wall = vizshape.addBox(size=[2.0, 2.0, 0.1])
+        wall.setPosition([0.0, 0.0, 5.0])
+
+        # Intersection test only runs while the cursor is shown
+        rec.enableGaze3D(False)
+        rec.showGazeCursor(True)
+        rec._onUpdate()
+        self.assertIsNotNone(rec.getCurrentGazeTarget())
+
+        # Hiding the cursor must not leave the last result in place
+        rec.showGazeCursor(False)
+        rec._onUpdate()
+        self.assertIsNone(rec.getCurrentGazeTarget())
+        self.assertEqual(rec.getCurrentGazePoint(), [rec.MISSING] * 3)
+        rec.startRecording()
+        rec.recordSample()
+        rec.stopRecording()
+        samples, events = rec.getLastRecording()
+        self.assertEqual(samples['gaze3d_valid'], [0])
+        self.assertEqual(samples['gaze3d_object_name'], [''])
+        wall.remove()
+
+
+    def test_gaze3d_disabled(self):
+        rec = SampleRecorder(eye_tracker=viz.addGroup(), key_calibrate=None, 
+                             key_preview=None, key_validate=None)
+        viz.MainView.setPosition([0.0, 0.0, 0.0])
+        viz.MainView.setEuler([0.0, 0.0, 0.0])
+        wall = vizshape.addBox(size=[2.0, 2.0, 0.1])
+        wall.setPosition([0.0, 0.0, 5.0])
+
+        rec._onUpdate()
+        self.assertIsNotNone(rec.getCurrentGazeTarget())
+
+        # Disabling clears the current result and skips the intersection test
+        rec.enableGaze3D(False)
+        self.assertIsNone(rec.getCurrentGazeTarget())
+        rec._onUpdate()
+        self.assertIsNone(rec.getCurrentGazeTarget())
+        self.assertEqual(rec.getCurrentGazePoint(), [rec.MISSING] * 3)
+        rec.enableGaze3D(True)
+        rec._onUpdate()
+        self.assertIsNotNone(rec.getCurrentGazeTarget())
+        wall.remove()
+
+
+    def test_stream_matches_saved(self):
+        fd, stream_file = mkstemp(suffix='.tsv')
+        os.close(fd)
+        fd, sample_file = mkstemp(suffix='.tsv')
+        os.close(fd)
+
+        rec, node = self._recorder()
+        rec.setCustomVar('cond', 'A')
+        rec.startRecording(stream_file=stream_file)
+        for x in [0.0, 1.0, 2.0]:
+            node.setPosition([x, 0.0, 0.0])
+            rec.recordSample()
+        rec.stopRecording()
+        rec.saveRecording(sample_file=sample_file)
+
+        with open(stream_file, 'r') as f:
+            streamed = f.read()
+        with open(sample_file, 'r') as f:
+            saved = f.read()
+        os.remove(stream_file)
+        os.remove(sample_file)
+        self.assertEqual(streamed, saved)
+        self.assertNotIn('quatW', streamed)
+
+
+    def test_track_eye(self):
+        rec = SampleRecorder(eye_tracker=ViveProEyeTracker(), track_eye='R', key_calibrate=None, 
+                             key_preview=None, key_validate=None)
+        viz.MainView.setPosition([0.0, 0.0, 0.0])
+        viz.MainView.setEuler([0.0, 0.0, 0.0])
+        rec.startRecording()
+        rec.recordSample()
+        rec.recordSample()
+        rec.stopRecording()
+
+        fd, sample_file = mkstemp(suffix='.tsv')
+        os.close(fd)
+        rec.saveRecording(sample_file=sample_file, clear_samples=False)
+        with open(sample_file, 'r') as f:
+            header = f.readline().rstrip('\n').split('\t')
+            values = dict(zip(header, f.readline().rstrip('\n').split('\t')))
+        os.remove(sample_file)
+
+        # Only right eye monocular data is recorded and exported
+        for field in ['gaze_posX', 'gazeR_posX', 'pupil_size', 'pupil_sizeR', 'eye_stateR']:
+            self.assertIn(field, header)
+        for field in ['gazeL_posX', 'pupil_sizeL', 'eye_stateL']:
+            self.assertNotIn(field, header)
+        self.assertAlmostEqual(float(values['gazeR_posX']), 0.03)
+        self.assertAlmostEqual(float(values['pupil_sizeR']), 3.0)
+
+        self.assertRaises(ValueError, rec.getCurrentGazeMatrix, viz.LEFT_EYE)
+        rec.getCurrentGazeMatrix(viz.RIGHT_EYE)
+
+
+    def test_save_pickle(self):
+        rec, node = self._recorder(ring_size=3)
+        rec.setCustomVar('cond', 'A')
+        self._record(rec, node, [0.0, 1.0, 2.0, 3.0])
+
+        fd, sample_file = mkstemp(suffix='.pkl')
+        os.close(fd)
+        rec.saveRecording(sample_file=sample_file, meta_cols={'trial': 1})
+        with open(sample_file, 'rb') as f:
+            data = pickle.load(f)
+        os.remove(sample_file)
 
+        self.assertEqual(data['meta'], {'trial': 1})
+        self.assertEqual(list(data['samples']['obj_posX']), [1.0, 2.0, 3.0])
+        self.assertEqual(list(data['samples']['cond']), ['A', 'A', 'A'])
+        self.assertNotIn('obj_quatW', data['samples'])
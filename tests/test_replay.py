@@ -1,8 +1,64 @@
 import unittest
 
+import os
+from tempfile import mkstemp
+
+import viz
+from vexptoolbox.recorder import SampleRecorder
 from vexptoolbox.replay import SampleReplay
 
+
 class TestReplay(unittest.TestCase):
-    pass
+
+    def setUp(self):
+        fd, self.sample_file = mkstemp(suffix='.tsv')
+        os.close(fd)
+        self._save_recording([0.0, 1.0, 2.0])
+
+
+    def _save_recording(self, positions):
+        """ Record one sample for each given X position of a tracked node 
+        and save the recording to self.sample_file """
+        rec = SampleRecorder(key_calibrate=None, key_preview=None, key_validate=None)
+        node = viz.addGroup()
+        rec.addTrackedNode(node, 'obj')
+        rec.startRecording()
+        for x in positions:
+            node.setPosition([x, 0.5, 0.0])
+            rec.recordSample()
+        rec.stopRecording()
+        rec.saveRecording(sample_file=self.sample_file)
+
+
+    def tearDown(self):
+        os.remove(self.sample_file)
+
+
+    def test_load_recording(self):
+        rp = SampleReplay(self.sample_file)
+        self.assertEqual(rp._n_samples, 3)
+        self.assertEqual(list(rp._columns['obj_posX']), [0.0, 1.0, 2.0])
+        self.assertEqual(list(rp._columns['obj_posY']), [0.5, 0.5, 0.5])
+        self.assertIn('obj', rp.replay_nodes)
+
+
+    def test_load_truncated(self):
+        # Incomplete last line, e.g. from a streamed recording
+        with open(self.sample_file, 'a') as f:
+            f.write('1.0\t2')
+        rp = SampleReplay(self.sample_file)
+        self.assertEqual(rp._n_samples, 3)
+        for field, col in rp._columns.items():
+            self.assertEqual(len(col), 3, field)
 
 
+    def test_replay_tolerance(self):
+        # Position changes below the replay tolerance are not applied
+        self._save_recording([0.0, 0.00001, 1.0])
+        rp = SampleReplay(self.sample_file, replay_view=False)
+        rp.setNodeVisibility('obj', True)
+        obj = rp._nodes['obj']['obj']
+        expected = [0.0, 0.0, 1.0]
+        for x in expected:
+            rp.replayCurrentFrame()
+            self.assertEqual(obj.getPosition()[0], x)
@@ -0,0 +1,32 @@
+import unittest
+
+import math
+
+from vexptoolbox import stats
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        self.x = [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]
+
+
+    def test_mean_sd(self):
+        self.assertAlmostEqual(stats.mean(self.x), 5.0)
+        self.assertAlmostEqual(stats.sd(self.x), 2.0)
+
+
+    def test_median(self):
+        self.assertAlmostEqual(stats.median(self.x), 4.5)
+        self.assertAlmostEqual(stats.median([3, 1, 2]), 2.0)
+
+
+    def test_rms(self):
+        self.assertAlmostEqual(stats.rmsi([0.0, 1.0, 3.0]), math.sqrt(2.5))
+        self.assertAlmostEqual(stats.rmsm(self.x), 2.0)
+        self.assertAlmostEqual(stats.rmsm3(self.x, self.x, self.x), math.sqrt(12.0))
+
+
+    def test_mad(self):
+        self.assertAlmostEqual(stats.mad([1, 1, 2, 2, 4, 6, 9]), 1.0)
+        self.assertAlmostEqual(stats.mad2([1, 1, 2, 2, 4, 6, 9], self.x), math.sqrt(1.25))
@@ -0,0 +1,71 @@
+import unittest
+
+from vexptoolbox import vrutil
+from vexptoolbox.vrutil import showVRText, showVRTextNoWait, VRTextBatch, preloadVRText
+
+
+class TestVRText(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = vrutil._vr_text_pool[False]
+
+
+    def _finish(self, task):
+        """ Run a showVRText task to completion without waiting """
+        for condition in task:
+            pass
+
+
+    def test_text_pool(self):
+        self._finish(showVRText('first', duration=0.0, fade=0))
+        n = len(self.pool)
+        self.assertGreater(n, 0)
+        text = self.pool[-1]
+        self.assertFalse(text.getVisible())
+
+        # Released text node is reused for the next message
+        task = showVRText('second', distance=3.0, duration=0.0, fade=0)
+        self.assertEqual(len(self.pool), n - 1)
+        self.assertTrue(text.getVisible())
+        self.assertEqual(text.distance, 3.0)
+        self._finish(task)
+        self.assertEqual(len(self.pool), n)
+        self.assertFalse(text.getVisible())
+
+
+    def test_text_batch(self):
+        self._finish(showVRText('first', duration=0.0, fade=0))
+        n = len(self.pool)
+        with VRTextBatch(duration=0.0, fade=0) as batch:
+            batch.add('first')
+            batch.add('second')
+            batch.add('top', row=0)
+            self.assertEqual(batch.lines, ['top', 'first', 'second'])
+            self.assertIsNone(batch.task)
+
+        # All lines are shown together using one text node when the block ends
+        self.assertEqual(batch.lines, [])
+        self.assertEqual(len(self.pool), n - 1)
+
+        # Messages shown outside add() are not batched
+        with VRTextBatch() as batch:
+            self._finish(showVRText('separate', duration=0.0, fade=0))
+            self.assertEqual(batch.lines, [])
+        self.assertIsNone(batch.task)
+
+
+    def test_preload(self):
+        n = len(self.pool)
+        preloadVRText(count=2)
+        self.assertEqual(len(self.pool), n + 2)
+        for text in self.pool[-2:]:
+            self.assertFalse(text.getVisible())
+
+
+    def test_show_nowait(self):
+        preloadVRText(count=1)
+        n = len(self.pool)
+        text = showVRTextNoWait('message', duration=0.0, fade=0)
+        self.assertTrue(text.getVisible())
+        self.assertEqual(len(self.pool), n - 1)
+        self.assertNotIn(text, self.pool)
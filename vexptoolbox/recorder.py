@@ -6,10 +6,13 @@
 import sys
 import csv
 import time
+import array
 import math
 import copy 
 import random 
 import pickle
+import threading
+import itertools
 
 import viz
 import vizact
@@ -24,21 +27,36 @@ from .eyeball import Eyeball
 # Python version compatibility
 if sys.version_info[0] == 3:
     from time import perf_counter
+    import queue
 else:
     from time import clock as perf_counter	
+    import Queue as queue
 
 VALIDATION_START_EVENT = viz.getEventID('EyeTrackerValidationStart')
 VALIDATION_END_EVENT = viz.getEventID('EyeTrackerValidationEnd')
 RECORDING_START_EVENT = viz.getEventID('RecordingStartEvent')
 RECORDING_END_EVENT = viz.getEventID('RecordingEndEvent')
 
+# Data columns logged for each node (view, gaze, tracked nodes etc.)
+NODE_FIELDS = ('posX', 'posY', 'posZ', 'dirX', 'dirY', 'dirZ', 'quatX', 'quatY', 'quatZ', 'quatW')
+GAZE3D_FIELDS = ('gaze3d_posX', 'gaze3d_posY', 'gaze3d_posZ', 'gaze3d_valid', 'gaze3d_object_id', 'gaze3d_object_name')
+
+
+# Storage type for sample data fields: array typecode, or None to store Python objects.
+# Fields not listed here are stored as double precision floats ('d').
+FIELD_TYPES = {'frameno': 'l', 'gaze3d_valid': 'l', 'gaze3d_object_id': 'l', 'gaze3d_object_name': None}
+
 
 class SampleRecorder(object):
 
+    # Node labels used by the recorder itself (lower case)
+    _reserved_labels = frozenset(['view', 'tracker', 'gaze', 'gaze3d', 'pupil', 
+                                  'trackerl', 'trackerr', 'gazel', 'gazer'])
+
     def __init__(self, eye_tracker=None, tracked_nodes=None, DEBUG=False, missing_val=-99999.0,
                  cursor=False, key_calibrate='c', key_preview='p', key_validate='v',
-                 targets=VAL_TAR_CR10, prealloc=324000, priority=viz.PRIORITY_PLUGINS+1,
-                 tracked_nodes_rf=viz.ABS_GLOBAL):
+                 targets=VAL_TAR_CR10, prealloc=5400, priority=viz.PRIORITY_PLUGINS+1,
+                 tracked_nodes_rf=viz.ABS_GLOBAL, ring_size=None, track_eye='both'):
         """ Eye movement recording and accuracy/precision measurement class.
 
         Args:
@@ -51,23 +69,39 @@ class SampleRecorder(object):
             key_preview (str): Vizard key code that should trigger target preview
             key_validate (str): Vizard key code that should trigger gaze validation
             targets: default validation target set to use (see validateEyeTracker())
-            prealloc (int): number of samples to preallocate to avoid skipped frames due to 
-                Python list extension. Default should be good for 60 min at 90 Hz.
+            prealloc (int): number of samples to preallocate storage for when recording starts,
+                to avoid skipped frames due to memory allocation. When full, storage is extended 
+                by the same number of samples. Each sample field takes 8 bytes per sample, i.e. 
+                about 0.7 kB per sample with a binocular eye tracker, so the default (1 min 
+                at 90 Hz) uses about 3.7 MB per chunk.
             priority: Vizard priority value to apply to sample collection task
             tracked_nodes_rf: Reference frame for tracked nodes, default: viz.ABS_GLOBAL
+            ring_size (int): if set, only keep the most recent ring_size samples in a 
+                fixed-size ring buffer instead of extending storage (e.g., 90 * 60 for 
+                the last minute at 90 Hz). Memory use then stays constant during recording.
+            track_eye (str): Monocular data to record for trackers that provide it:
+                'both' (default), 'L' or 'R'. Recording one eye saves tracker calls 
+                on each frame. Binocular gaze is always recorded.
         """
         self.debug = DEBUG
         self.priority = priority
 
         # Eye tracker properties
+        if track_eye not in ('both', 'L', 'R'):
+            raise ValueError('track_eye must be one of "both", "L", or "R".')
+        self.track_eye = track_eye
+        self._mono_eyes = []
         self._tracker = None
         self._tracker_type = None
         self._tracker_has_eye_flag = False
+        self._get_pupil = None
+        self._get_eye_open = None
         if eye_tracker is not None:
             self.addEyeTracker(eye_tracker)
 
         # Additional tracked Vizard nodes
         self._tracked_nodes = {}
+        self._tracked_items = [] # (label, getMatrix method), used on each frame
         if tracked_nodes is not None and type(tracked_nodes) == dict:
             for label in list(tracked_nodes.keys()):
                 self.addTrackedNode(node=tracked_nodes[label], label=label)
@@ -85,18 +119,40 @@ class SampleRecorder(object):
         self._gaze3d_intersect = None
         self._gaze3d_intersect_name = ''
         self._gaze3d_last_valid = None
+        self._gaze3d_enabled = True
+        self._gaze3d_every = 1
+        self._cursor_visible = False
+
+        # Reusable matrices for gaze-in-world data that is not kept between frames
+        self._scratch_gW = viz.Matrix()
+        self._scratch_gWL = viz.Matrix()
+        self._scratch_gWR = viz.Matrix()
 
         # Sample recording task
         self.recording = False
         self._force_update = False
-        self._samples = [None,] * prealloc
+        self._log_quat = True
+        self._reset_schema()
+        self._columns = {}
+        self._custom_columns = {}
+        self._capacity = 0
         self._samples_idx = 0
         self._prealloc = prealloc
+        self._ring_size = ring_size
+        self._wrapped = False
         self._val_samples = []
+        self._val_keys = None
         self._events = []
+        self._timing = (0.0, -1, 0.0) # cached by _frame_timing()
+        self._stream_queue = None
+        self._stream_thread = None
         self._customvars = ParamSet()
         self._recorder = vizact.onupdate(self.priority, self._onUpdate)
 
+        # Validation sample recorder, only enabled while sampling gaze data
+        self._val_recorder = vizact.onupdate(-1, self._record_val_sample)
+        self._val_recorder.setEnabled(False)
+
         # Gaze validation
         self._scene = viz.addScene()
         self.fix_size = 0.5 # radius in degrees
@@ -144,29 +200,47 @@ class SampleRecorder(object):
         return m
 
 
+    def _target_sizes(self, d):
+        """ Return sizes of validation target parts at a given viewing distance
+        
+        Args:
+            d (float): Viewing distance in meters
+            
+        Returns: tuple (outer radius, outer height, inner radius) in meters
+        """
+        return (self._deg2m(self.fix_size, d), self._deg2m(self.fix_size/20.0, d), 
+                self._deg2m(self.fix_size/5.0, d))
+
+
+    def _frame_timing(self):
+        """ Return timing of the current frame as a tuple 
+        (Vizard time in ms, Vizard frame number, system time in ms).
+        Timing is only read once per frame and shared by all callers. """
+        frame = viz.getFrameNumber()
+        if frame != self._timing[1]:
+            self._timing = (viz.tick() * 1000.0, frame, perf_counter() * 1000.0)
+        return self._timing
+
+
     def _record_val_sample(self):
         """ Record a gaze sample during validation """
         
         if self._force_update:
             viz.update(viz.UPDATE_PLUGINS | viz.UPDATE_LINKS)
 
-        s = {}
-        s['time'] = viz.tick() * 1000.0
-        s['frameno'] = viz.getFrameNumber()
-        s['systime'] = perf_counter() * 1000.0
+        if self._val_keys is None:
+            self._val_keys = self._val_sample_keys()
 
         # Gaze, target, and view nodes
         cW = viz.MainView.getMatrix()		# Camera-in-World FoR (Head for HMDs)
         gT = self._tracker.getMatrix()		# Gaze-in-Tracker FoR
         vgT = gT.getForward()				# Gaze-in-Tracker unit vector
-        gW = copy.deepcopy(gT)				# Gaze-in-World FoR
+        gW = self._scratch_gW				# Gaze-in-World FoR
+        gW.set(gT)
         gW.postMult(cW)
         vgW = gW.getForward()				# Gaze-in-World unit vector
-        nodes = {'tracker': gT,
-                 'view':	cW,
-                 'gaze': 	gW}
-        vecs = {'gazeVec':    vgW,
-                'trackVec': vgT}
+        nodes = [gT, cW, gW]
+        vecs = [vgW, vgT]
 
         # Monocular data, if available
         if self._tracker_has_eye_flag:	
@@ -174,42 +248,56 @@ class SampleRecorder(object):
             gTR = self._tracker.getMatrix(flag=viz.RIGHT_EYE)
             vgTL = gTL.getForward()
             vgTR = gTR.getForward()
-            gWL = copy.deepcopy(gTL)
-            gWR = copy.deepcopy(gTR)
+            gWL = self._scratch_gWL
+            gWR = self._scratch_gWR
+            gWL.set(gTL)
+            gWR.set(gTR)
             gWL.postMult(cW)
             gWR.postMult(cW)
             vgWL = gWL.getForward()
             vgWR = gWR.getForward()
-            nodes['trackerL'] = gTL
-            nodes['trackerR'] = gTR
-            nodes['gazeL'] = gWL
-            nodes['gazeR'] = gWR
-            vecs['gazeVecL'] = vgWL
-            vecs['gazeVecR'] = vgWR
-            vecs['trackVecL'] = vgTL
-            vecs['trackVecR'] = vgTR
-
-        # Store position data
-        for lbl, node_matrix in nodes.items():
-            p = node_matrix.getPosition()
-            s['{:s}_posX'.format(lbl)] = p[0]
-            s['{:s}_posY'.format(lbl)] = p[1]
-            s['{:s}_posZ'.format(lbl)] = p[2]
-
-        # Store gaze unit direction vectors
-        for lbl, vec in vecs.items():
-            s['{:s}_X'.format(lbl)] = vec[0]
-            s['{:s}_Y'.format(lbl)] = vec[1]
-            s['{:s}_Z'.format(lbl)] = vec[2]
-        
-        self._val_samples.append(s)
+            nodes += [gTL, gTR, gWL, gWR]
+            vecs += [vgWL, vgWR, vgTL, vgTR]
+
+        # Store timing, position data and gaze unit direction vectors 
+        # as a flat tuple in the order of self._val_keys
+        s = list(self._frame_timing())
+        for node_matrix in nodes:
+            s.extend(node_matrix.getPosition())
+        for vec in vecs:
+            s.extend(vec)
+        self._val_samples.append(tuple(s))
  
     
+    def _val_sample_keys(self):
+        """ Return data field names for validation samples, matching
+        the order of values stored by _record_val_sample() """
+        nodes = ['tracker', 'view', 'gaze']
+        vecs = ['gazeVec', 'trackVec']
+        if self._tracker_has_eye_flag:
+            nodes += ['trackerL', 'trackerR', 'gazeL', 'gazeR']
+            vecs += ['gazeVecL', 'gazeVecR', 'trackVecL', 'trackVecR']
+        keys = ['time', 'frameno', 'systime']
+        for lbl in nodes:
+            keys += ['{:s}_posX'.format(lbl), '{:s}_posY'.format(lbl), '{:s}_posZ'.format(lbl)]
+        for lbl in vecs:
+            keys += ['{:s}_X'.format(lbl), '{:s}_Y'.format(lbl), '{:s}_Z'.format(lbl)]
+        return tuple(keys)
+
+
+    def _clear_val_samples(self):
+        """ Clear validation sample data before sampling starts. Data fields 
+        are fixed until the next call, even if the recorder schema changes. """
+        self._val_samples = []
+        self._val_keys = self._val_sample_keys()
+
+
     def _get_val_samples(self):
-        """ Retrieve and clear current validation data """
+        """ Retrieve and clear current validation data as a list of dicts """
         s = self._val_samples
         self._val_samples = []
-        return s
+        keys = self._val_keys
+        return [dict(zip(keys, values)) for values in s]
         
     
     def addEyeTracker(self, eye_tracker, replace=False):
@@ -226,9 +314,25 @@ class SampleRecorder(object):
 
         self._tracker = eye_tracker
         self._tracker_type = type(eye_tracker).__name__
-        if self._tracker_type in ['ViveProEyeTracker']:
-            # Trackers supporting monocular data via the sensor flag parameter
-            self._tracker_has_eye_flag = True
+        # Trackers supporting monocular data via the sensor flag parameter
+        self._tracker_has_eye_flag = self._tracker_type in ['ViveProEyeTracker']
+
+        # Monocular data to record, as (label suffix, sensor flag)
+        self._mono_eyes = []
+        if self._tracker_has_eye_flag:
+            if self.track_eye in ('both', 'L'):
+                self._mono_eyes.append(('L', viz.LEFT_EYE))
+            if self.track_eye in ('both', 'R'):
+                self._mono_eyes.append(('R', viz.RIGHT_EYE))
+
+        # Optional device-specific data, looked up once instead of on every sample.
+        # Only used for trackers known to support the eye flag argument.
+        self._get_pupil = None
+        self._get_eye_open = None
+        if self._tracker_has_eye_flag:
+            self._get_pupil = getattr(eye_tracker, 'getPupilDiameter', None)
+            self._get_eye_open = getattr(eye_tracker, 'getEyeOpen', None)
+        self._reset_schema() # sample fields changed
         self._dlog('Added eye tracker: {:s}.'.format(self._tracker_type))
 
 
@@ -241,13 +345,133 @@ class SampleRecorder(object):
             node: any Vizard Node3D object
             label (str): Label for this node in log files
         """
-        reserved = ['view', 'tracker', 'gaze', 'gaze3d', 'pupil'] + list(self._tracked_nodes.keys())
-        if label.lower() in reserved:
-            raise ValueError('Tracked node label "{:s}" exists! Please choose a different label.'.format(label))
+        if label.lower() in self._reserved_labels or label in self._tracked_nodes:
+            raise ValueError('Tracked node label "{:s}" is reserved or exists! Please choose a different label.'.format(label))
         self._tracked_nodes[label] = node
+        self._tracked_items = [(lbl, n.getMatrix) for (lbl, n) in self._tracked_nodes.items()]
+        self._reset_schema() # sample fields changed
         self._dlog('Added tracked node: {:s} (ID: {:d}).'.format(label, node.id))
 
 
+    def _reset_schema(self):
+        """ Mark sample data fields for rebuilding, e.g. after adding a tracked node """
+        self._fields = None
+        self._export_cache = {}
+
+
+    def _build_schema(self):
+        """ Set up sample data fields and storage columns for the current 
+        eye tracker and tracked nodes. Data already recorded is kept. """
+        labels = ['view']
+        if self._tracker is not None:
+            labels += ['tracker', 'gaze']
+            labels += ['tracker' + e for (e, flag) in self._mono_eyes]
+            labels += ['gaze' + e for (e, flag) in self._mono_eyes]
+        labels += list(self._tracked_nodes.keys())
+
+        # Quaternion fields are not stored if disabled in startRecording()
+        node_fields = NODE_FIELDS
+        if not self._log_quat:
+            node_fields = NODE_FIELDS[0:6]
+
+        fields = ['time', 'frameno', 'systime']
+        for lbl in labels:
+            fields += ['{:s}_{:s}'.format(lbl, f) for f in node_fields]
+
+        # Device-specific eye data, as (field, getter, eye) 
+        eye_data = []
+        if self._tracker is not None:
+            fields += GAZE3D_FIELDS
+            for (field, getter) in [('pupil_size', self._get_pupil), ('eye_state', self._get_eye_open)]:
+                if getter is not None:
+                    eye_data.append((field, getter, viz.BOTH_EYE))
+                    for (e, flag) in self._mono_eyes:
+                        eye_data.append((field + e, getter, flag))
+            fields += [e[0] for e in eye_data]
+
+        # Allocate one preallocated column per field (structure of arrays)
+        if self._capacity == 0:
+            if self._ring_size is not None:
+                self._capacity = self._ring_size
+            else:
+                self._capacity = self._prealloc
+        eye_fields = [e[0] for e in eye_data]
+        for f in fields:
+            if f not in self._columns:
+                typecode = FIELD_TYPES.get(f, 'd')
+                if f in eye_fields:
+                    typecode = None # device-specific data type
+                self._columns[f] = self._new_column(typecode, self._capacity)
+
+        # Fields no longer recorded: discard, or set missing from current sample onwards.
+        # In a wrapped ring buffer, slots after the current sample still hold the oldest 
+        # samples, so the whole column is set to missing instead.
+        for f in list(self._columns.keys()):
+            if f not in fields:
+                if self._sample_count() == 0:
+                    del self._columns[f]
+                else:
+                    col = self._columns[f]
+                    start = 0 if self._wrapped else self._samples_idx
+                    col[start:] = self._new_column(getattr(col, 'typecode', None), 
+                                                   self._capacity - start)
+        self._fields = fields
+        self._export_cache = {}
+
+        # Column references used when storing each sample
+        cols = self._columns
+        self._time_cols = (cols['time'], cols['frameno'], cols['systime'])
+        self._node_cols = {}
+        for lbl in labels:
+            self._node_cols[lbl] = tuple([cols['{:s}_{:s}'.format(lbl, f)] for f in node_fields])
+        if self._tracker is not None:
+            self._gaze3d_cols = tuple([cols[f] for f in GAZE3D_FIELDS])
+        self._eye_cols = tuple([(cols[f], getter, eye) for (f, getter, eye) in eye_data])
+
+
+    def _new_column(self, typecode, length):
+        """ Create a sample data column filled with missing values
+        
+        Args:
+            typecode: array typecode, or None to create a list of Python objects
+            length (int): Number of samples
+        """
+        if typecode is None:
+            return ['',] * length
+        elif typecode == 'd':
+            return array.array(typecode, [self.MISSING]) * length
+        else:
+            return array.array(typecode, [int(self.MISSING)]) * length
+
+
+    def _sample_count(self):
+        """ Return the number of samples currently stored """
+        if self._wrapped:
+            return self._capacity
+        return self._samples_idx
+
+
+    def _column_values(self, col):
+        """ Iterate over the stored values of a sample data column in recording order
+        
+        Args:
+            col: Sample data column (array or list)
+        """
+        n = self._samples_idx
+        if self._wrapped:
+            # Ring buffer: oldest samples start at the current write position
+            return itertools.chain(itertools.islice(col, n, self._capacity), itertools.islice(col, 0, n))
+        return itertools.islice(col, 0, n)
+
+
+    def _grow_columns(self):
+        """ Extend all sample data columns when preallocated storage is full """
+        for col in itertools.chain(self._columns.values(), self._custom_columns.values()):
+            col.extend(self._new_column(getattr(col, 'typecode', None), self._prealloc))
+        self._capacity += self._prealloc
+        self._dlog('Sample storage extended to {:d} samples.'.format(self._capacity))
+
+
     def getCurrentGazePoint(self):
         """ Returns the current 3d gaze point if gaze intersects with the scene. """
         return self._gaze3d
@@ -260,16 +484,21 @@ class SampleRecorder(object):
             eye (int): Eye to return gaze matrix for, e.g. viz.LEFT_EYE
         """
         err = 'The eye= argument requires monocular gaze data, which is not available for the current eye tracker.'
+        err_eye = 'Gaze data for this eye is not recorded, see the track_eye argument of SampleRecorder.'
         if eye is not None:
             if eye == viz.LEFT_EYE:
                 if not self._tracker_has_eye_flag:
                     return NotImplementedError(err)
+                elif self.track_eye == 'R':
+                    raise ValueError(err_eye)
                 else:
                     return self._gazematL
 
             elif eye == viz.RIGHT_EYE:
                 if not self._tracker_has_eye_flag:
                     return NotImplementedError(err)
+                elif self.track_eye == 'L':
+                    raise ValueError(err_eye)
                 else:
                     return self._gazematR
 
@@ -387,6 +616,36 @@ class SampleRecorder(object):
     def showGazeCursor(self, visible):
         """ Set visibility of the gaze cursor node """
         self._cursor.visible(visible)
+        self._cursor_visible = bool(visible)
+        if not visible and not self._gaze3d_enabled:
+            # Intersection test no longer runs, don't keep the last result
+            self._clear_gaze3d()
+
+
+    def enableGaze3D(self, enabled=True, every=1):
+        """ Enable or disable the 3D gaze intersection test run on each frame. 
+        This raycast can be expensive in complex scenes. When disabled, 3D gaze 
+        data is logged as missing and gaze-based selection methods (e.g., 
+        waitGazeDwell) will not work, unless the gaze cursor is shown.
+        
+        Args:
+            enabled (bool): if True, compute 3D gaze point and target on each frame
+            every (int): only run the intersection test every n-th display frame,
+                keeping the previous result in between
+        """
+        self._gaze3d_enabled = enabled
+        self._gaze3d_every = max(1, int(every))
+        if not enabled:
+            self._clear_gaze3d()
+
+
+    def _clear_gaze3d(self):
+        """ Reset current 3D gaze data to missing """
+        missing = self.MISSING
+        self._gaze3d = [missing, missing, missing]
+        self._gaze3d_valid = False
+        self._gaze3d_intersect = None
+        self._gaze3d_intersect_name = ''
 
 
     def getValResults(self):
@@ -403,13 +662,24 @@ class SampleRecorder(object):
             return None
 
 
+    def getLastValResultRef(self):
+        """ Return the ValidationResult object resulting from the most recent
+        gaze validation measurement without copying it. The returned object is 
+        stored by the recorder and must be treated as read-only, but this is 
+        faster than getLastValResult() if only a few values need to be read. """
+        if len(self._validation_results) > 0:
+            return self._validation_results[-1]
+        else:
+            return None
+
+
     def _getRawRecording(self, clear=True):
         """ Return last recording data as list of dicts """
-        sidx = self._samples_idx
-        rec_s = copy.copy(self._samples)
+        fields = list(self._columns.keys()) + list(self._custom_columns.keys())
+        columns = itertools.chain(self._columns.values(), self._custom_columns.values())
+        rec_s = [dict(zip(fields, values)) for values in 
+                 zip(*[self._column_values(col) for col in columns])]
         rec_e = copy.copy(self._events)
-        if sidx < self._prealloc:
-            rec_s = rec_s[0:sidx]
         if clear:
             self.clearRecording(samples=True, events=True)        
         return (rec_s, rec_e)
@@ -428,30 +698,11 @@ class SampleRecorder(object):
         if self.recording:
             print('getLastRecording(): Recording is still active, data may be incomplete!')
 
-        sidx = self._samples_idx
-        rec_s = copy.copy(self._samples)
+        for f, col in itertools.chain(self._columns.items(), self._custom_columns.items()):
+            samples[f] = list(self._column_values(col))
         rec_e = copy.copy(self._events)
-        if sidx < self._prealloc:
-            rec_s = rec_s[0:sidx] # cut to size if preallocated
-
-        # Collect all data fields beforehand, so we can set None for missing data
-        s_fields = []
-        for s in rec_s:
-            for key in s.keys():
-                if key not in s_fields:
-                    s_fields.append(key)
-        s_fields = sorted(s_fields)                    
         e_fields = ['time', 'message']
 
-        for f in s_fields:
-            if f not in samples.keys():
-                samples[f] = []
-            for s in rec_s:
-                try:
-                    samples[f].append(s[f])
-                except KeyError:
-                    samples[f].append(None)
-
         for f in e_fields:
             if f not in events.keys():
                 events[f] = []
@@ -516,13 +767,11 @@ class SampleRecorder(object):
             raise NotImplementedError(err.format(self._tracker_type))
 
         # Sample gaze data using the validation recorder
-        val_recorder = vizact.onupdate(-1, self._record_val_sample)
-        self._val_samples = [] # task starts out enabled, so might have recorded a stray sample
+        self._clear_val_samples()
+        self._val_recorder.setEnabled(True)
         yield viztask.waitTime(float(sample_dur) / 1000)
-        val_recorder.setEnabled(False)
+        self._val_recorder.setEnabled(False)
         s = self._get_val_samples()
-        val_recorder.setEnabled(False)
-        val_recorder.remove()
 
         # Calculate average IPD
         ipdval = []
@@ -560,6 +809,7 @@ class SampleRecorder(object):
         # Set up depth planes and targets
         t_dists = []
         t_planes = {}
+        t_sizes = {}
         t_objs = {}
         for tgt in targets:
             d = tgt[2]
@@ -568,6 +818,7 @@ class SampleRecorder(object):
                 t_planes[d] = vizshape.addPlane(size=(1000.0, 1000.0), axis=vizshape.AXIS_Z, scene=self._scene,
                                                      flipFaces=True, color=self.tar_plane_color, parent=root)
                 t_planes[d].setPosition([0.0, 0.0, d], mode=viz.REL_PARENT)
+                t_sizes[d] = self._target_sizes(d)
                 t_objs[d] = []
             
             # Find target position on depth plane using raycasting
@@ -581,8 +832,9 @@ class SampleRecorder(object):
                 if obj.object == t_planes[d]:
                     tar_pos = obj.point
             t = viz.addGroup(scene=self._scene, parent=root)
-            t_out = vizshape.addCylinder(radius=self._deg2m(self.fix_size, d), height=self._deg2m(self.fix_size/20.0, d), parent=t, scene=self._scene, axis=vizshape.AXIS_Z, color=(1, 1, 1))
-            t_in = vizshape.addSphere(radius=self._deg2m(self.fix_size/5.0, d), parent=t, scene=self._scene, color=(0,0,0))
+            (r_out, h_out, r_in) = t_sizes[d]
+            t_out = vizshape.addCylinder(radius=r_out, height=h_out, parent=t, scene=self._scene, axis=vizshape.AXIS_Z, color=(1, 1, 1))
+            t_in = vizshape.addSphere(radius=r_in, parent=t, scene=self._scene, color=(0,0,0))
             t.setPosition(tar_pos, mode=viz.ABS_GLOBAL)
             
             # Preview only: highlight each center target
@@ -662,6 +914,7 @@ class SampleRecorder(object):
         root = viz.addGroup(scene=self._scene)
         t_dists = []
         t_planes = {}
+        t_sizes = {}
         all_targets = []
         c = 0
         for tgt in targets:
@@ -672,6 +925,7 @@ class SampleRecorder(object):
                 t_planes[d] = vizshape.addPlane(size=(1000.0, 1000.0), axis=vizshape.AXIS_Z, scene=self._scene,
                                                      flipFaces=True, color=self.tar_plane_color, parent=root)
                 t_planes[d].setPosition([0.0, 0.0, d], mode=viz.REL_PARENT)
+                t_sizes[d] = self._target_sizes(d)
             
             # Find target position on depth plane using raycasting
             tar_mat = vizmat.Transform()
@@ -684,9 +938,10 @@ class SampleRecorder(object):
                 if obj.object == t_planes[d]:
                     tar_pos = obj.point
             t = viz.addGroup(scene=self._scene, parent=root)
-            #t_out = vizshape.addSphere(radius=self._deg2m(self.fix_size, d), parent=t, scene=self._scene, color=(1, 1, 1))
-            t_out = vizshape.addCylinder(radius=self._deg2m(self.fix_size, d), height=self._deg2m(self.fix_size/20.0, d), parent=t, scene=self._scene, axis=vizshape.AXIS_Z, color=(1, 1, 1))
-            t_in = vizshape.addSphere(radius=self._deg2m(self.fix_size/5.0, d), parent=t, scene=self._scene, color=(0,0,0), pos=[0, 0, -self._deg2m(self.fix_size, d)])
+            (r_out, h_out, r_in) = t_sizes[d]
+            #t_out = vizshape.addSphere(radius=r_out, parent=t, scene=self._scene, color=(1, 1, 1))
+            t_out = vizshape.addCylinder(radius=r_out, height=h_out, parent=t, scene=self._scene, axis=vizshape.AXIS_Z, color=(1, 1, 1))
+            t_in = vizshape.addSphere(radius=r_in, parent=t, scene=self._scene, color=(0,0,0), pos=[0, 0, -r_out])
             t.setPosition(tar_pos, mode=viz.ABS_GLOBAL)
             t.visible(False)
             tgtHMD = t.getPosition(mode=viz.REL_PARENT) # target in HMD space
@@ -710,33 +965,44 @@ class SampleRecorder(object):
         viz.MainView.getHeadLight().enable()
         self._dlog('Validation scene set up complete')
 
-        # Initialize validation recorder
-        val_recorder = vizact.onupdate(-1, self._record_val_sample)
-        val_recorder.setEnabled(False)
-        self._val_samples = [] # task starts out enabled, so might have recorded a stray sample
+        # Clear validation sample buffer
+        self._clear_val_samples()
 
+        # Target presentation order
+        order = list(range(len(all_targets)))
         if randomize:
-            cal_targets = random.sample(all_targets, len(all_targets))
-        else:
-            cal_targets = all_targets
+            random.shuffle(order)
+
+        # Sample keys used for binocular ('') and monocular ('L', 'R') measures
+        eyes = ['']
+        if self._tracker_has_eye_flag:
+            eyes += ['L', 'R']
+        eye_keys = []
+        for eye in eyes:
+            eye_keys.append((eye,
+                             ['tracker{:s}_pos{:s}'.format(eye, a) for a in 'XYZ'],
+                             ['trackVec{:s}_{:s}'.format(eye, a) for a in 'XYZ'],
+                             ['targetErr{:s}'.format(eye), 'targetErr{:s}_X'.format(eye), 'targetErr{:s}_Y'.format(eye),
+                              'targetGaze{:s}_X'.format(eye), 'targetGaze{:s}_Y'.format(eye)]))
 
         # Calculate data quality measures per target
         tar_data = []
         sam_data = []
-        for (c, tarpos, tgtHMD, ct, tplane) in cal_targets:
+        for idx in order:
+            (c, tarpos, tgtHMD, ct, tplane) = all_targets[idx]
 
             d = {}
 
             # Record gaze samples
             yield viztask.waitTime(1.0)
-            val_recorder.setEnabled(True)
+            self._val_recorder.setEnabled(True)
             if self.recording:
                 self.recordEvent('VAL_START {:d} {:.1f} {:.1f} {:.1f}'.format(c, *tarpos))
             tplane.visible(True)
             ct.visible(True)
 
             yield viztask.waitTime(float(dur) / 1000)
-            val_recorder.setEnabled(False)
+            self._val_recorder.setEnabled(False)
             s = self._get_val_samples()
             ct.color([0.1, 1.0, 0.1])
             yield viztask.waitTime(0.2)
@@ -746,21 +1012,6 @@ class SampleRecorder(object):
             if self.recording:
                 self.recordEvent('VAL_END {:d} {:.1f} {:.1f} {:.1f}'.format(c, *tarpos))
             
-            # Binocular measures
-            delta = []
-            deltaX = []
-            deltaY = []
-            gazeX = []
-            gazeY = []
-
-            # Monocular measures, only used when supported
-            ipdM = []
-            deltaM = [[], []] # monocular as [L, R]
-            deltaXM = [[], []]
-            deltaYM = [[], []]
-            gazeXM = [[], []]
-            gazeYM = [[], []]
-            
             d['set_no'] = c
             d['x'] =  tarpos[0]
             d['y'] =  tarpos[1]
@@ -772,142 +1023,57 @@ class SampleRecorder(object):
             # TODO: use actual fixation detector here!
             s = s[20:]
 
+            # Error and gaze angles per sample, for binocular and monocular (if available) data
+            err = {}
+            for eye in eyes:
+                err[eye] = ([], [], [], [], []) # delta, deltaX, deltaY, gazeX, gazeY
+            ipdM = []
+
             for sam in s:
-                # Calculate gaze-target angular errors in HMD space
-                gazeOri = (sam['tracker_posX'], sam['tracker_posY'], sam['tracker_posZ'])
-                eyeTarVec = vizmat.VectorToPoint(gazeOri, tgtHMD)
-                eyeGazeVec = (sam['trackVec_X'], sam['trackVec_Y'], sam['trackVec_Z'])
-
-                dC = vizmat.AngleBetweenVector(eyeGazeVec, eyeTarVec)
-                sam['targetErr'] = dC
-
-                angularDiff = vizmat.Transform()
-                angularDiff.makeVecRotVec(eyeTarVec, eyeGazeVec)
-                (dX, dY, _) = angularDiff.getEuler()
-                dY = -dY
-                sam['targetErr_X'], sam['targetErr_Y'] = dX, dY
-
-                delta.append(dC)
-                deltaX.append(dX)
-                deltaY.append(dY)
-
-                # Average gaze angle in HMD space
-                eyeHeadVec = (sam['trackVec_X'], sam['trackVec_Y'], sam['trackVec_Z'])
-                eyeHeadRot = vizmat.Transform()
-                eyeHeadRot.makeVecRotVec([0, 0, 1], eyeHeadVec)
-                (gX, gY, _) = eyeHeadRot.getEuler()
-                gY = -gY
-
-                gazeX.append(gX)
-                gazeY.append(gY)
-                sam['targetGaze_X'], sam['targetGaze_Y'] = gX, gY
-
-                # Monocular data, if available
+                for (eye, ori_keys, vec_keys, err_keys) in eye_keys:
+                    # Calculate gaze-target angular errors in HMD space
+                    gazeOri = [sam[k] for k in ori_keys]
+                    eyeTarVec = vizmat.VectorToPoint(gazeOri, tgtHMD)
+                    eyeGazeVec = [sam[k] for k in vec_keys]
+
+                    dC = vizmat.AngleBetweenVector(eyeGazeVec, eyeTarVec)
+                    angularDiff = vizmat.Transform()
+                    angularDiff.makeVecRotVec(eyeTarVec, eyeGazeVec)
+                    (dX, dY, _) = angularDiff.getEuler()
+
+                    # Average gaze angle in HMD space
+                    eyeHeadRot = vizmat.Transform()
+                    eyeHeadRot.makeVecRotVec([0, 0, 1], eyeGazeVec)
+                    (gX, gY, _) = eyeHeadRot.getEuler()
+
+                    values = (dC, dX, -dY, gX, -gY)
+                    for key, vlist, v in zip(err_keys, err[eye], values):
+                        sam[key] = v
+                        vlist.append(v)
+
                 if self._tracker_has_eye_flag:
                     ipdM.append(abs(sam['trackerR_posX'] - sam['trackerL_posX']) * 1000.0)
-                    for eyei, eye in enumerate(['L', 'R']):
-                        # Angular gaze-target errors
-                        gazeOriM = (sam['tracker{:s}_posX'.format(eye)],
-                                    sam['tracker{:s}_posY'.format(eye)],
-                                    sam['tracker{:s}_posZ'.format(eye)])
-                        eyeTarVecM = vizmat.VectorToPoint(gazeOriM, tgtHMD)
-                        eyeGazeVecM = (sam['trackVec{:s}_X'.format(eye)],
-                                       sam['trackVec{:s}_Y'.format(eye)],
-                                       sam['trackVec{:s}_Z'.format(eye)])
-                        
-                        dCM = vizmat.AngleBetweenVector(eyeGazeVecM, eyeTarVecM)
-                        sam['targetErr{:s}'.format(eye)] = dCM
-
-                        angularDiffM = vizmat.Transform()
-                        angularDiffM.makeVecRotVec(eyeTarVecM, eyeGazeVecM)
-                        (dXM, dYM, _) = angularDiff.getEuler()
-                        dYM = -dYM                        
-                        sam['targetErr{:s}_X'.format(eye)] = dXM
-                        sam['targetErr{:s}_Y'.format(eye)] = dYM
-
-                        deltaM[eyei].append(dCM)
-                        deltaXM[eyei].append(dXM)
-                        deltaYM[eyei].append(dYM)
-
-                        # Average gaze angles
-                        eyeHeadVecM = (sam['trackVec{:s}_X'.format(eye)], 
-                                       sam['trackVec{:s}_Y'.format(eye)], 
-                                       sam['trackVec{:s}_Z'.format(eye)])
-                        eyeHeadRotM = vizmat.Transform()
-                        eyeHeadRotM.makeVecRotVec([0, 0, 1], eyeHeadVecM)
-                        (gXM, gYM, _) = eyeHeadRotM.getEuler()
-                        gYM = -gYM
-                        
-                        sam['targetGaze{:s}_X'.format(eye)] = gXM
-                        sam['targetGaze{:s}_Y'.format(eye)] = gYM
-                        gazeXM[eyei].append(gXM)
-                        gazeYM[eyei].append(gYM)
-
-            # Gaze position and offset
-            d['avgX'] = mean(gazeX)
-            d['avgY'] = mean(gazeY)
-            d['medX'] = median(gazeX)
-            d['medY'] = median(gazeY)
-            d['offX'] = mean(deltaX)
-            d['offY'] = mean(deltaY)
-
-            # Accuracy 
-            d['acc'] = mean(delta)
-            d['accX'] = mean([abs(v) for v in deltaX])
-            d['accY'] = mean([abs(v) for v in deltaY])
-            d['medacc'] = median(delta)
-            d['medaccX'] = median([abs(v) for v in deltaX])
-            d['medaccY'] = median([abs(v) for v in deltaY])
-
-            # Precision
-            d['sd'] = sd(delta)
-            d['sdX'] = sd(deltaX)
-            d['sdY'] = sd(deltaY)
-            d['rmsi'] = rmsi(delta)
-            d['rmsiX'] = rmsi(deltaX)
-            d['rmsiY'] = rmsi(deltaY)
-
-            # Monocular measures and IPD
+
+            # Accuracy and precision measures
+            for eye in eyes:
+                if eye == '':
+                    suffix = ''
+                else:
+                    suffix = '_{:s}'.format(eye)
+                for var, value in self._val_measures(*err[eye]):
+                    d[var + suffix] = value
             if self._tracker_has_eye_flag:
                 d['ipd'] = mean(ipdM)
-                for eyei, eye in enumerate(['L', 'R']):
-                    d['avgX_{:s}'.format(eye)] = mean(gazeXM[eyei])
-                    d['avgY_{:s}'.format(eye)] = mean(gazeYM[eyei])
-                    d['medX_{:s}'.format(eye)] = median(gazeXM[eyei])
-                    d['medY_{:s}'.format(eye)] = median(gazeYM[eyei])
-                    d['offX_{:s}'.format(eye)] = mean(deltaXM[eyei])
-                    d['offY_{:s}'.format(eye)] = mean(deltaYM[eyei])
-                    d['acc_{:s}'.format(eye)] = mean(deltaM[eyei])
-                    d['accX_{:s}'.format(eye)] = mean([abs(v) for v in deltaXM[eyei]])
-                    d['accY_{:s}'.format(eye)] = mean([abs(v) for v in deltaYM[eyei]])
-                    d['medacc_{:s}'.format(eye)] = median(deltaM[eyei])
-                    d['medaccX_{:s}'.format(eye)] = median([abs(v) for v in deltaXM[eyei]])
-                    d['medaccY_{:s}'.format(eye)] = median([abs(v) for v in deltaYM[eyei]])
-                    d['sd_{:s}'.format(eye)] = sd(deltaM[eyei])
-                    d['sdX_{:s}'.format(eye)] = sd(deltaXM[eyei])
-                    d['sdY_{:s}'.format(eye)] = sd(deltaYM[eyei])
-                    d['rmsi_{:s}'.format(eye)] = rmsi(deltaM[eyei])
-                    d['rmsiX_{:s}'.format(eye)] = rmsi(deltaXM[eyei])
-                    d['rmsiY_{:s}'.format(eye)] = rmsi(deltaYM[eyei])
 
             tar_data.append(d)
             sam_data.append(s)
 
             self._dlog('VAL_END {:d} {:.1f} {:.1f} {:.1f}'.format(c, *tarpos))
 
-        # Remove validation recorder
-        val_recorder.setEnabled(False)
-        val_recorder.remove()
-
-        # Calculate grand average for each measure
+        # Calculate grand average for each measure (all targets have the same measures)
         avg_data = {}
-        for tar in tar_data:
-            for var in tar.keys():
-                if var not in avg_data:
-                    avg_data[var] = []
-                avg_data[var].append(tar[var])
-        for var in avg_data.keys():
-            avg_data[var] = mean(avg_data[var])
+        for var in tar_data[0].keys():
+            avg_data[var] = mean([tar[var] for tar in tar_data])
 
         # Clear and return to previous scene
         root.remove(children=True)
@@ -925,13 +1091,37 @@ class SampleRecorder(object):
 
         rv = ValidationResult(result=avg_data, samples=sam_data, targets=tar_data, metadata=rmeta)
         if self.recording:
-                self.recordEvent('VAL_RESULT {:.2f} {:.2f} {:.2f}'.format(d['acc'], d['rmsi'], d['sd']))
+                self.recordEvent('VAL_RESULT {:.2f} {:.2f} {:.2f}'.format(avg_data['acc'], avg_data['rmsi'], avg_data['sd']))
 
         self._validation_results.append(copy.deepcopy(rv))
         viz.sendEvent(VALIDATION_END_EVENT)
         viztask.returnValue(rv)
 
 
+    def _val_measures(self, delta, deltaX, deltaY, gazeX, gazeY):
+        """ Calculate gaze accuracy and precision measures for one validation target
+
+        Args:
+            delta (list): Angular gaze-target errors
+            deltaX, deltaY (list): Horizontal and vertical gaze-target errors
+            gazeX, gazeY (list): Horizontal and vertical gaze angles
+
+        Returns: list of (measure, value) tuples
+        """
+        absX = [abs(v) for v in deltaX]
+        absY = [abs(v) for v in deltaY]
+        return [# Gaze position and offset
+                ('avgX', mean(gazeX)), ('avgY', mean(gazeY)), 
+                ('medX', median(gazeX)), ('medY', median(gazeY)),
+                ('offX', mean(deltaX)), ('offY', mean(deltaY)),
+                # Accuracy
+                ('acc', mean(delta)), ('accX', mean(absX)), ('accY', mean(absY)),
+                ('medacc', median(delta)), ('medaccX', median(absX)), ('medaccY', median(absY)),
+                # Precision
+                ('sd', sd(delta)), ('sdX', sd(deltaX)), ('sdY', sd(deltaY)),
+                ('rmsi', rmsi(delta)), ('rmsiX', rmsi(deltaX)), ('rmsiY', rmsi(deltaY))]
+
+
     def checkEyeTrackerDrift(self, threshold=1.5, auto_calibrate=True):
         """ Run single-target validation to check for eye tracker drift. 
 
@@ -952,67 +1142,98 @@ class SampleRecorder(object):
         viztask.returnValue(val_res.acc)
 
     
-    def _onUpdate(self):
-        """ Task callback that runs on each display frame. Always updates 
-        current gaze data properties, triggers sample recording if recording is on.
-        """
-        if self._force_update:
-            viz.update(viz.UPDATE_PLUGINS | viz.UPDATE_LINKS)
-
-        time_ms = viz.tick() * 1000.0		# Vizard time
-        frame = viz.getFrameNumber()		# Vizard frame number
-        clock = perf_counter() * 1000.0 		# Python system time
+    def _compute_nodes(self, current=False, tracked=True):
+        """ Collect transform matrices of view, eye tracker and tracked nodes
+        for the current frame. 
+        
+        Args:
+            current (bool): if True, gaze matrices are new objects stored as current
+                gaze data. Otherwise, reusable matrices are returned that are only 
+                valid until the next call.
+            tracked (bool): if True, include additional tracked nodes
 
+        Returns: dict of viz.Matrix objects, indexed by node label
+        """
         cW = viz.MainView.getMatrix()		# Camera-in-World FoR (Head for HMDs)
         nodes = {'view': cW}
 
-        if self._tracker is not None:
+        tracker = self._tracker
+        if tracker is not None:
             # Gaze and view nodes
-            gT = self._tracker.getMatrix()		# Gaze-in-Tracker FoR
-            gW = copy.deepcopy(gT)				# Gaze-in-World FoR
+            getMatrix = tracker.getMatrix
+            gT = getMatrix()					# Gaze-in-Tracker FoR
+            if current:
+                gW = viz.Matrix(gT)			# Gaze-in-World FoR
+                self._gazemat = gW
+            else:
+                gW = self._scratch_gW
+                gW.set(gT)
             gW.postMult(cW)
-            self._gazemat = gW
             nodes['tracker'] = gT
             nodes['gaze'] = gW
 
             # Monocular data, if available
-            if self._tracker_has_eye_flag:
-                gTL = self._tracker.getMatrix(flag=viz.LEFT_EYE)
-                gTR = self._tracker.getMatrix(flag=viz.RIGHT_EYE)
-                gWL = copy.deepcopy(gTL)
-                gWR = copy.deepcopy(gTR)
-                gWL.postMult(cW)
-                gWR.postMult(cW)
-                self._gazematL = gWL
-                self._gazematR = gWR
-                nodes['trackerL'] = gTL
-                nodes['trackerR'] = gTR
-                nodes['gazeL'] = gWL
-                nodes['gazeR'] = gWR
-            
-            # Update current gaze information and cursor position
-            g3D_line = gW.getLineForward(1000)
-            g3D_test = viz.intersect(g3D_line.begin, g3D_line.end)
+            for (e, flag) in self._mono_eyes:
+                gTM = getMatrix(flag=flag)
+                if current:
+                    gWM = viz.Matrix(gTM)
+                    if e == 'L':
+                        self._gazematL = gWM
+                    else:
+                        self._gazematR = gWM
+                else:
+                    if e == 'L':
+                        gWM = self._scratch_gWL
+                    else:
+                        gWM = self._scratch_gWR
+                    gWM.set(gTM)
+                gWM.postMult(cW)
+                nodes['tracker' + e] = gTM
+                nodes['gaze' + e] = gWM
+
+        # Additional tracked nodes
+        if tracked:
+            rf = self._tracked_nodes_rf
+            for (lbl, getNodeMatrix) in self._tracked_items:
+                nodes[lbl] = getNodeMatrix(rf)
+
+        return nodes
+
+
+    def _onUpdate(self):
+        """ Task callback that runs on each display frame. Always updates 
+        current gaze data properties, triggers sample recording if recording is on.
+        """
+        if self._force_update:
+            viz.update(viz.UPDATE_PLUGINS | viz.UPDATE_LINKS)
+
+        timing = self._frame_timing()		# Vizard time, frame number, system time
+        nodes = self._compute_nodes(current=True, tracked=self.recording)
+
+        # Update current gaze information and cursor position. The intersection
+        # test is skipped if not needed, or throttled to every n-th frame
+        gaze3d_needed = self._gaze3d_enabled or self._cursor_visible
+        if self._tracker is not None and gaze3d_needed and timing[1] % self._gaze3d_every == 0:
+            # Gaze ray from raw matrix data: position and 1000 m along forward (Z) axis
+            m = nodes['gaze'].get()
+            begin = (m[12], m[13], m[14])
+            end = (m[12] + 1000.0 * m[8], m[13] + 1000.0 * m[9], m[14] + 1000.0 * m[10])
+            g3D_test = viz.intersect(begin, end)
             if g3D_test.valid:
-                self._gaze3d = g3D_test.point
+                point = g3D_test.point
+                obj = g3D_test.object
+                self._gaze3d = point
                 self._gaze3d_valid = True
-                self._gaze3d_intersect = g3D_test.object
+                self._gaze3d_intersect = obj
                 self._gaze3d_intersect_name = g3D_test.name
-                self._gaze3d_last_valid = g3D_test.object
-                self._cursor.setPosition(g3D_test.point)
+                self._gaze3d_last_valid = obj
+                self._cursor.setPosition(point)
             else:
-                self._gaze3d = [self.MISSING, self.MISSING, self.MISSING]
-                self._gaze3d_valid = False
-                self._gaze3d_intersect = None
+                self._clear_gaze3d()
 
         # Record sample if enabled
         if self.recording:
-            # Additional tracked nodes
-            for obj in self._tracked_nodes.keys():
-                nodes[obj] = self._tracked_nodes[obj].getMatrix(self._tracked_nodes_rf)
-
-            sample = ((time_ms, frame, clock), nodes)
-            self.recordSample(sample=sample)
+            self.recordSample(sample=(timing, nodes))
 
 
     def recordSample(self, console=False, sample=None):
@@ -1021,96 +1242,68 @@ class SampleRecorder(object):
         
         Args:
             console (bool): if True, print logged value to Vizard console
-            sample: sample data, if called via _onUpdate (internal use)
+            sample: tuple of (timing, nodes) if called via _onUpdate (internal use)
         """
-        s = {}
-
         if sample is not None:
-            # Store sample data coming from update callback
+            # Sample data coming from update callback
             (timing, nodes) = sample
-            s['time'] = timing[0]
-            s['frameno'] = timing[1]
-            s['systime'] = timing[2]
 
         else:
             # Record a sample manually 
-            s['time'] = viz.tick() * 1000.0
-            s['frameno'] = viz.getFrameNumber()
-            s['systime'] = perf_counter() * 1000.0
-
-            cW = viz.MainView.getMatrix()		# Camera-in-World FoR (Head for HMDs)
-            nodes = {'view': cW}
-
-            if self._tracker is not None:
-                gT = self._tracker.getMatrix()		# Gaze-in-Tracker FoR
-                gW = copy.deepcopy(gT)				# Gaze-in-World FoR
-                gW.postMult(cW)
-                nodes['tracker'] = gT
-                nodes['gaze'] = gW
-
-                if self._tracker_has_eye_flag:
-                    gTL = self._tracker.getMatrix(flag=viz.LEFT_EYE)
-                    gTR = self._tracker.getMatrix(flag=viz.RIGHT_EYE)
-                    gWL = copy.deepcopy(gTL)
-                    gWR = copy.deepcopy(gTR)
-                    gWL.postMult(cW)
-                    gWR.postMult(cW)
-                    nodes['trackerL'] = gTL
-                    nodes['trackerR'] = gTR
-                    nodes['gazeL'] = gWL
-                    nodes['gazeR'] = gWR
-
-            for obj in self._tracked_nodes.keys():
-                nodes[obj] = self._tracked_nodes[obj].getMatrix(mode=self._tracked_nodes_rf)
+            timing = self._frame_timing()
+            nodes = self._compute_nodes()
+
+        if self._fields is None:
+            self._build_schema()
+        n = self._samples_idx
+        if n >= self._capacity:
+            if self._ring_size is not None:
+                # Ring buffer full: overwrite oldest samples
+                n = 0
+                self._wrapped = True
+            else:
+                self._grow_columns()
+        (c_time, c_frameno, c_systime) = self._time_cols
+        (c_time[n], c_frameno[n], c_systime[n]) = timing
 
         # Store position and orientation data
+        node_cols = self._node_cols
+        log_quat = self._log_quat
         for lbl, node_matrix in nodes.items():
-            p = node_matrix.getPosition()
-            d = node_matrix.getEuler()
-            q = node_matrix.getQuat()
-            s['{:s}_posX'.format(lbl)] = p[0]
-            s['{:s}_posY'.format(lbl)] = p[1]
-            s['{:s}_posZ'.format(lbl)] = p[2]
-            s['{:s}_dirX'.format(lbl)] = d[0]
-            s['{:s}_dirY'.format(lbl)] = d[1]
-            s['{:s}_dirZ'.format(lbl)] = d[2]
-            s['{:s}_quatX'.format(lbl)] = q[0]
-            s['{:s}_quatY'.format(lbl)] = q[1]
-            s['{:s}_quatZ'.format(lbl)] = q[2]
-            s['{:s}_quatW'.format(lbl)] = q[3]
+            c = node_cols[lbl]
+            (c[0][n], c[1][n], c[2][n]) = node_matrix.getPosition()
+            (c[3][n], c[4][n], c[5][n]) = node_matrix.getEuler()
+            if log_quat:
+                (c[6][n], c[7][n], c[8][n], c[9][n]) = node_matrix.getQuat()
 
         if self._tracker is not None:
             # Store 3D gaze point data
-            s['gaze3d_posX'] = self._gaze3d[0]
-            s['gaze3d_posY'] = self._gaze3d[1]
-            s['gaze3d_posZ'] = self._gaze3d[2]
+            c = self._gaze3d_cols
+            (c[0][n], c[1][n], c[2][n]) = self._gaze3d
             if self._gaze3d_valid:
-                s['gaze3d_valid'] = 1
-                s['gaze3d_object_id'] = int(self._gaze3d_intersect.id)
-                s['gaze3d_object_name'] = str(self._gaze3d_intersect_name)
+                (c[3][n], c[4][n], c[5][n]) = (1, int(self._gaze3d_intersect.id), str(self._gaze3d_intersect_name))
             else:
-                s['gaze3d_valid'] = 0
-                s['gaze3d_object_id'] = -1
-                s['gaze3d_object_name'] = ''
+                (c[3][n], c[4][n], c[5][n]) = (0, -1, '')
 
             # Device-specific eye tracking data
-            if self._tracker_type == 'ViveProEyeTracker':
-                s['pupil_size'] = self._tracker.getPupilDiameter(viz.BOTH_EYE)
-                s['pupil_sizeL'] = self._tracker.getPupilDiameter(viz.LEFT_EYE)
-                s['pupil_sizeR'] = self._tracker.getPupilDiameter(viz.RIGHT_EYE)
-                s['eye_state'] = self._tracker.getEyeOpen(viz.BOTH_EYE)
-                s['eye_stateL'] = self._tracker.getEyeOpen(viz.LEFT_EYE)
-                s['eye_stateR'] = self._tracker.getEyeOpen(viz.RIGHT_EYE)
+            for (col, getter, eye) in self._eye_cols:
+                col[n] = getter(eye)
 
         # Additional data fields
-        s.update(self._customvars)
-        
-        # Add to preallocated list, or switch to appending if full
-        if self._samples_idx < self._prealloc:
-            self._samples[self._samples_idx] = s
-            self._samples_idx += 1
-        else:
-            self._samples.append(s)
+        for var, value in self._customvars.__dict__.items():
+            try:
+                col = self._custom_columns[var]
+            except KeyError:
+                col = self._custom_columns[var] = self._new_column(None, self._capacity)
+            col[n] = value
+        self._samples_idx = n + 1
+
+        # Pass sample to file writer thread
+        if self._stream_queue is not None:
+            customvars = self._customvars.__dict__
+            row = ['' if col is None else col[n] for col in self._stream_cols]
+            row += [customvars.get(var, '') for var in self._stream_custom]
+            self._stream_queue.put(row)
 
         if console:
             # Note: printing coordinates will likely slow down rendering a lot! Use for debugging only.
@@ -1120,13 +1313,13 @@ class SampleRecorder(object):
                 gWp = nodes['gaze'].getPosition()
                 gWd = nodes['gaze'].getEuler()
                 pupilDia = self.MISSING
-                if 'pupil_size' in s.keys():
-                    pupilDia = s['pupil_size']
+                if 'pupil_size' in self._columns:
+                    pupilDia = self._columns['pupil_size'][n]
                 outformat = '{:.4f} {:d}\tviewPOS=({:.3f}, {:.3f}, {:.3f}),\tviewDIR=({:.3f}, {:.3f}, {:.3f}),\tgazePOS=({:.3f}, {:.3f}, {:.3f}),\tgazeDIR=({:.3f}, {:.3f}, {:.3f}), p={:.3f}'
-                print(outformat.format(s['time'], s['frameno'], cWp[0], cWp[1], cWp[2], cWd[0], cWd[1], cWd[2], gWp[0], gWp[1], gWp[2], gWd[0], gWd[1], gWd[2], pupilDia))
+                print(outformat.format(timing[0], timing[1], cWp[0], cWp[1], cWp[2], cWd[0], cWd[1], cWd[2], gWp[0], gWp[1], gWp[2], gWd[0], gWd[1], gWd[2], pupilDia))
             else:
                 outformat = '{:.4f} {:d}\tviewPOS=({:.3f}, {:.3f}, {:.3f}),\tviewDIR=({:.3f}, {:.3f}, {:.3f})'
-                print(outformat.format(s['time'], s['frameno'], cWp[0], cWp[1], cWp[2], cWd[0], cWd[1], cWd[2]))
+                print(outformat.format(timing[0], timing[1], cWp[0], cWp[1], cWp[2], cWd[0], cWd[1], cWd[2]))
 
 
     def recordEvent(self, event=''):
@@ -1136,18 +1329,34 @@ class SampleRecorder(object):
         Args:
             event (str): event string to log
         """
-        ev = {'time': viz.tick() * 1000,
+        ev = {'time': self._frame_timing()[0],
                'message': str(event)}
         self._events.append(ev)
 
 
-    def startRecording(self, force_update=False):
+    def startRecording(self, force_update=False, log_quat=True, stream_file=None, sep='\t', 
+                       stream_quat=False):
         """ Start recording samples on each display frame
         
         Args:
             force_update (bool): it True, force Vizard to update sensor data
+            log_quat (bool): if True, also record rotation Quaternions for all nodes (default).
+                Set to False to save memory and time per sample if Quaternions are not needed.
+            stream_file: Name of output file to continuously write samples to while 
+                recording, in the same format as saveRecording(). File output runs in 
+                a background thread. Custom variables must be set before recording
+                starts to be included. Combine with ring_size to limit memory use.
+            sep (str): Field separator in stream_file
+            stream_quat (bool): if True, also write rotation Quaternions to stream_file
+                (see the quat argument of saveRecording())
         """
         if not self.recording:
+            if stream_file is not None and stream_quat and not log_quat:
+                raise ValueError('startRecording(): stream_quat=True requires log_quat=True!')
+            self._log_quat = log_quat
+            self._build_schema()
+            if stream_file is not None:
+                self._start_stream(stream_file, sep, stream_quat)
             self._force_update = force_update
             self.recording = True
             self.recordEvent('REC_START')
@@ -1162,43 +1371,166 @@ class SampleRecorder(object):
         """ Stop sample recording """
         if self.recording:
             self.recording = False
+            self._stop_stream()
             self.recordEvent('REC_STOP')
             self._dlog('Recording stopped.')
             self._force_update = False
             viz.sendEvent(RECORDING_END_EVENT)
 
 
+    def _start_stream(self, stream_file, sep='\t', quat=False):
+        """ Open a sample file and start the background thread writing 
+        samples to it during recording
+
+        Args:
+            stream_file: Name of output file to write samples to
+            sep (str): Field separator in output file
+            quat (bool): if True, also write rotation Quaternions
+        """
+        fields = self._export_fields(self._columns, quat)
+        custom_fields = list(self._customvars.__dict__.keys())
+        self._stream_cols = [self._columns.get(f, None) for f in fields]
+        self._stream_custom = custom_fields
+
+        of = open(stream_file, 'w')
+        writer = csv.writer(of, delimiter=sep, lineterminator='\n')
+        writer.writerow(fields + custom_fields)
+
+        self._stream_queue = queue.Queue()
+        self._stream_thread = threading.Thread(target=self._stream_writer, args=(self._stream_queue, writer, of))
+        self._stream_thread.daemon = True
+        self._stream_thread.start()
+        self._dlog('Streaming samples to file: {:s}'.format(stream_file))
+
+
+    def _stream_writer(self, q, writer, of):
+        """ Background thread: write queued sample rows until None is received
+
+        Args:
+            q: Queue of sample rows
+            writer: csv.writer object for output file
+            of: Output file object, closed when done
+        """
+        try:
+            while True:
+                row = q.get()
+                if row is None:
+                    break
+                writer.writerow(row)
+        finally:
+            of.close()
+
+
+    def _stop_stream(self):
+        """ Finish writing streamed samples and close the output file """
+        if self._stream_queue is not None:
+            self._stream_queue.put(None)
+            self._stream_thread.join()
+            self._stream_queue = None
+            self._stream_thread = None
+            self._dlog('Sample stream closed.')
+
+
     def saveRecording(self, sample_file=None, event_file=None, clear_samples=True, clear_events=True, 
                       sep='\t', quat=False, meta_cols={}, _data=None, _append=False):
         """ Save current gaze recording to a tab-separated CSV file 
         and clear the current recording by default.
         
         Args:
-            sample_file: Name of output file to write gaze samples to
+            sample_file: Name of output file to write gaze samples to. If the file name
+                ends in '.pkl', samples are saved in binary form instead, as a pickled 
+                dict {'samples': {field: values}, 'meta': meta_cols}, which is much 
+                faster to save and load for long recordings
             event_file: Name of output file to write event data to
             clear_samples (bool): if True, clear recorded samples after saving
             clear_events (bool): if True, clear recorded events after saving
             sep (str): Field separator in output file
-            quat (bool): if True, also export rotation Quaternions
+            quat (bool): if True, also export rotation Quaternions. Raises an error if 
+                recording was started using startRecording(log_quat=False)
             meta_cols (dict): Dict of values to add to each sample (e.g., trial number)
             _data: Tuple (samples, events) to save, None for current recording (mostly internal use)
         """
         # Select data to save
         if _data is not None:
             samples, events = _data
+            available = samples[0].keys() if len(samples) > 0 else []
         else:
-            # Current recording: cut to size if < preallocation limit
-            if self._samples_idx < self._prealloc:
-                self._samples = self._samples[0:self._samples_idx]
-            samples = self._samples
+            # Current recording: stored as columns
+            samples = None
             events = self._events
+            available = self._columns
 
         if _append:
             writemode = 'a'
         else:
             writemode = 'w'
 
-        # Samples: select keys to be exported and build file format
+        # Samples: select keys to be exported
+        if quat and _data is None and not self._log_quat:
+            raise ValueError('saveRecording(): Quaternions were not recorded, use startRecording(log_quat=True)!')
+        fields = self._export_fields(available, quat)
+
+        evfields = ['time', 'message']
+
+        # Optional metadata
+        meta_fields = list(meta_cols.keys())
+        meta_values = [meta_cols[f] for f in meta_fields]
+        for event in events:
+            event.update(meta_cols)
+        evfields += meta_fields
+
+        # Custom sample variables
+        custom_fields = list(self._customvars.__dict__.keys())
+        if samples is None:
+            custom_fields += [f for f in self._custom_columns.keys() if f not in custom_fields]
+
+        # Samples
+        if sample_file is not None and sample_file.lower().endswith('.pkl'):
+            self._save_samples_pickle(sample_file, samples, fields + custom_fields, meta_cols, _append)
+        elif sample_file is not None:
+            with open(sample_file, writemode) as of:
+                writer = csv.writer(of, delimiter=sep, lineterminator='\n')
+                if not _append:
+                    writer.writerow(fields + meta_fields + custom_fields)
+                writer.writerows(self._sample_rows(samples, fields + meta_fields + custom_fields, meta_cols))
+            if samples is None:
+                n = self._sample_count()
+            else:
+                n = len(samples)
+            self._dlog('Saved {:d} samples to file: {:s}'.format(n, sample_file))
+
+        # Events
+        if event_file is not None:
+            with open(event_file, writemode) as ef:
+                writer = csv.DictWriter(ef, delimiter=sep, lineterminator='\n', fieldnames=evfields)
+                if not _append:
+                    writer.writeheader()
+                for event in events:
+                    writer.writerow(event)
+            self._dlog('Saved {:d} events to file: {:s}'.format(len(events), event_file))
+
+        if sample_file is None and event_file is None:
+            self._dlog('Neither sample_file nor event_file were specified. No data saved.')
+        else:
+            if _data is None and (clear_samples or clear_events):
+                self.clearRecording(samples=clear_samples, events=clear_events)
+
+
+    def _export_fields(self, available, quat=False):
+        """ Return list of sample data fields to export to a file
+
+        Args:
+            available: Collection of recorded data fields, used for tracker-specific fields
+            quat (bool): if True, include rotation Quaternions
+        """
+        # Field list only changes with recorder configuration, so is cached
+        if available is self._columns:
+            key = (None, quat, self.debug)
+        else:
+            key = (frozenset(available), quat, self.debug)
+        if key in self._export_cache:
+            return list(self._export_cache[key])
+
         fields = ['time', 'systime', 'view_posX', 'view_posY', 'view_posZ', 'view_dirX', 'view_dirY', 'view_dirZ']
 
         # Eye tracker fields
@@ -1211,7 +1543,7 @@ class SampleRecorder(object):
                     'gazeR_posX', 'gazeR_posY', 'gazeR_posZ', 'gazeR_dirX', 'gazeR_dirY', 'gazeR_dirZ',
                     'pupil_size', 'pupil_sizeL', 'pupil_sizeR', 'eye_state', 'eye_stateL', 'eye_stateR']
             for field in special:
-                if field in samples[0].keys():
+                if field in available:
                     fields += [field,]
 
         # Additional tracked nodes
@@ -1229,55 +1561,75 @@ class SampleRecorder(object):
 
         if self.debug and self._tracker is not None:
             fields += ['tracker_posX', 'tracker_posY', 'tracker_posZ', 'tracker_dirX', 'tracker_dirY', 'tracker_dirZ']
-            if self._tracker_has_eye_flag:
-                fields += ['trackerL_posX', 'trackerL_posY', 'trackerL_posZ', 'trackerL_dirX', 'trackerL_dirY', 'trackerL_dirZ',
-                           'trackerR_posX', 'trackerR_posY', 'trackerR_posZ', 'trackerR_dirX', 'trackerR_dirY', 'trackerR_dirZ']
+            for (e, flag) in self._mono_eyes:
+                fields += ['tracker{:s}_{:s}'.format(e, f) for f in NODE_FIELDS[0:6]]
 
             if quat:
                 fields += ['tracker_quatX', 'tracker_quatY', 'tracker_quatZ', 'tracker_quatW']
-                if self._tracker_has_eye_flag:
-                    fields += ['trackerL_quatX', 'trackerL_quatY', 'trackerL_quatZ', 'trackerL_quatW',
-                               'trackerR_quatX', 'trackerR_quatY', 'trackerR_quatZ', 'trackerR_quatW']
+                for (e, flag) in self._mono_eyes:
+                    fields += ['tracker{:s}_{:s}'.format(e, f) for f in NODE_FIELDS[6:10]]
 
-        evfields = ['time', 'message']
+        self._export_cache[key] = tuple(fields)
+        return fields
 
-        # Optional metadata
-        for sample in samples:
-            sample.update(meta_cols)
-        fields += list(meta_cols.keys())
-        for event in events:
-            event.update(meta_cols)
-        evfields += list(meta_cols.keys())
 
-        # Custom sample variables
-        fields += list(self._customvars.__dict__.keys())
+    def _save_samples_pickle(self, sample_file, samples, fields, meta_cols={}, append=False):
+        """ Save sample data columns to a binary pickle file. Appended data
+        is stored as consecutive pickled objects in the same file.
 
-        # Samples
-        if sample_file is not None:
-            with open(sample_file, writemode) as of:
-                writer = csv.DictWriter(of, delimiter=sep, lineterminator='\n', 
-                                        fieldnames=fields, extrasaction='ignore')
-                if not _append:
-                    writer.writeheader()
-                for sample in samples:
-                    writer.writerow(sample)
-            self._dlog('Saved {:d} samples to file: {:s}'.format(len(samples), sample_file))
+        Args:
+            sample_file: Name of output file
+            samples: List of sample dicts, or None to save the current recording
+            fields (list): Data fields to save
+            meta_cols (dict): Dict of values describing all samples (e.g., trial number)
+            append (bool): if True, append to existing file
+        """
+        columns = {}
+        if samples is None:
+            for f in fields:
+                col = self._columns.get(f, self._custom_columns.get(f, None))
+                if col is None:
+                    continue
+                elif hasattr(col, 'typecode'):
+                    columns[f] = array.array(col.typecode, self._column_values(col))
+                else:
+                    columns[f] = list(self._column_values(col))
+        else:
+            for f in fields:
+                columns[f] = [s.get(f, '') for s in samples]
 
-        # Events
-        if event_file is not None:
-            with open(event_file, writemode) as ef:
-                writer = csv.DictWriter(ef, delimiter=sep, lineterminator='\n', fieldnames=evfields)
-                if not _append:
-                    writer.writeheader()
-                for event in events:
-                    writer.writerow(event)
-            self._dlog('Saved {:d} events to file: {:s}'.format(len(events), event_file))
+        if append:
+            writemode = 'ab'
+        else:
+            writemode = 'wb'
+        with open(sample_file, writemode) as of:
+            # Protocol 2 can be read by both Python 2 and 3
+            pickle.dump({'samples': columns, 'meta': dict(meta_cols)}, of, protocol=2)
 
-        if sample_file is None and event_file is None:
-            self._dlog('Neither sample_file nor event_file were specified. No data saved.')
+
+    def _sample_rows(self, samples, fields, meta_cols={}):
+        """ Generate rows of sample values for export. Missing values are left empty.
+
+        Args:
+            samples: List of sample dicts, or None to export the current recording
+            fields (list): Data fields to export
+            meta_cols (dict): Values to add to each sample
+        """
+        if samples is None:
+            n = self._sample_count()
+            columns = []
+            for f in fields:
+                if f in meta_cols:
+                    columns.append(itertools.repeat(meta_cols[f], n))
+                elif f in self._columns:
+                    columns.append(self._column_values(self._columns[f]))
+                elif f in self._custom_columns:
+                    columns.append(self._column_values(self._custom_columns[f]))
+                else:
+                    columns.append(itertools.repeat('', n))
+            return zip(*columns)
         else:
-            if _data is None and (clear_samples or clear_events):
-                self.clearRecording(samples=clear_samples, events=clear_events)
+            return ([meta_cols[f] if f in meta_cols else s.get(f, '') for f in fields] for s in samples)
 
 
     def clearRecording(self, samples=True, events=True):
@@ -1288,10 +1640,18 @@ class SampleRecorder(object):
             events (bool): if True, clear event data
         """
         self.recording = False
+        self._stop_stream()
         dtypes = []
         if samples:
-            self._samples = [None,] * self._prealloc
+            # Keep allocated columns for reuse, but drop those no longer recorded
             self._samples_idx = 0
+            self._wrapped = False
+            self._custom_columns = {}
+            if self._fields is not None:
+                for f in list(self._columns.keys()):
+                    if f not in self._fields:
+                        del self._columns[f]
+            self._export_cache = {} # available fields changed
             dtypes.append('samples')
         if events:
             self._events = []
@@ -3,9 +3,11 @@
 # vexptoolbox: Vizard Toolbox for Behavioral Experiments
 # Gaze and object position and orientation replay class
 
+import sys
 import csv
-import random
+import array
 import colorsys
+from operator import itemgetter
 from vexptoolbox.recorder import SampleRecorder
 
 import viz
@@ -16,7 +18,130 @@ import vizshape
 
 from .eyeball import Eyeball
 
+# Sample data fields used to replay the viewpoint
+VIEW_DIR_FIELDS = ('view_dirX', 'view_dirY', 'view_dirZ')
+VIEW_POS_FIELDS = ('view_posX', 'view_posY', 'view_posZ')
+
+# Replayed nodes are only updated when data changes by more than these tolerances
+REPLAY_TOL_POS = 0.0001 # m
+REPLAY_TOL_DIR = 0.001  # deg
+
+# Sample data output in console mode, written to the console in batches of frames
+CONSOLE_LINE = 't={:.2f}s, f={:d}'
+CONSOLE_GAZE = '\tgaze3d=[{:0.2f}, {:0.2f}, {:0.2f}]\tgaze=[{:0.2f}, {:0.2f}, {:0.2f}]'
+CONSOLE_FIELDS = ('gaze3d_posX', 'gaze3d_posY', 'gaze3d_posZ', 'gaze_dirX', 'gaze_dirY', 'gaze_dirZ')
+CONSOLE_FLUSH_FRAMES = 50
+
+# Number of lines converted at a time when loading a sample file
+LOAD_CHUNK_SIZE = 100000
+
+# Number of frames between status GUI updates during replay
+UI_UPDATE_FRAMES = 10
+
+# Distinct colors for tracked nodes, using golden ratio steps around the hue circle
+# (starting from orange to set them apart from the red and blue built-in nodes)
+_NODE_PALETTE = [colorsys.hsv_to_rgb((0.15 + k * 0.6180339887) % 1.0, 0.7, 0.85) for k in range(64)]
+
+
+def _column_type(values):
+    """ Determine the data type of a column of CSV fields from its first 
+    non-empty field. Returns int, float, str for text columns, or None if
+    all fields are empty. """
+    for data in values:
+        if data != '':
+            for conv in (int, float):
+                try:
+                    conv(data)
+                    return conv
+                except ValueError:
+                    pass
+            return str
+    return None
+
+
+def _convert_column(values, conv=None):
+    """ Convert a column of CSV fields to int or float values, if possible.
+    Float columns are stored as contiguous arrays of doubles. Text columns are
+    kept as strings, numeric columns with other content (e.g. missing values) 
+    are converted per field. 
+
+    Args:
+        values (list): CSV fields (str)
+        conv: Column type as returned by _column_type(), or None to detect
+    """
+    if conv is None:
+        conv = _column_type(values)
+    if conv is None or conv is str:
+        return list(values)
+    if conv is int:
+        try:
+            return list(map(int, values))
+        except ValueError:
+            pass
+    try:
+        return array.array('d', map(float, values))
+    except ValueError:
+        pass
+    column = []
+    for data in values:
+        try:
+            column.append(int(data))
+        except ValueError:
+            try:
+                column.append(float(data))
+            except ValueError:
+                column.append(data)
+    return column
+
+
+def _convert_chunk(columns, raw_columns, column_types):
+    """ Convert a chunk of CSV fields and append it to the converted data columns.
+    The raw field lists are emptied in place to be reused for the next chunk.
+
+    Args:
+        columns (list): Converted data columns (list or array)
+        raw_columns (list): Lists of CSV fields for each column
+        column_types (list): Detected column types, updated on first non-empty chunk
+    """
+    for k, raw in enumerate(raw_columns):
+        if len(raw) == 0:
+            continue
+        if column_types[k] is None:
+            column_types[k] = _column_type(raw)
+        chunk = _convert_column(raw, column_types[k])
+        if isinstance(columns[k], array.array) and not isinstance(chunk, array.array):
+            columns[k] = list(columns[k])
+        elif len(columns[k]) == 0:
+            columns[k] = chunk
+            chunk = []
+        columns[k].extend(chunk)
+        del raw[:]
+
+
+def _changed(last, values, tol):
+    """ Return True if any value differs from the last applied value by more than tol """
+    for a, b in zip(last, values):
+        if abs(a - b) > tol:
+            return True
+    return False
+
+
+class _EyeState(object):
+    """ Replay settings, data columns and visualization nodes for one eye """
+    __slots__ = ('data', 'node', 'visible', 'eye', 'axes', 'ui', 'dir_fields', 'pos_fields',
+                 'dir_cols', 'pos_cols', 'mat', 'scale', 'last')
+
+    def __init__(self):
+        for attr in self.__slots__:
+            setattr(self, attr, None)
+
+
 class SampleReplay(object):
+
+    __slots__ = ('_gaze', '_nodes', 'replay_nodes', '_frame', '_player', 'replaying', 'finished',
+                 'console', '_console_buf', '_console_cols', 'replay_view', '_view_dir_cols', '_view_pos_cols',
+                 '_columns', '_n_samples', '_sample_time_offset', '_rel_time',
+                 '_ui', '_ui_bar', '_ui_time', '_ui_play', '_ui_view')
     
     def __init__(self, recording=None, ui=True, eyeball=True, console=False, eye='BINOCULAR',
                  replay_view=True):
@@ -38,65 +163,73 @@ class SampleReplay(object):
             replay_view (bool): if True, move the MainView with recorded sample data
         """
         # Create gaze visualization nodes
-        self._gaze = {'L': {}, 'R': {}, '': {}}
+        self._gaze = {'L': _EyeState(), 'R': _EyeState(), '': _EyeState()}
         for eye_pos in list(self._gaze.keys()):
-            self._gaze[eye_pos]['data'] = False
-            self._gaze[eye_pos]['node'] = None
-            self._gaze[eye_pos]['eye'] = Eyeball(visible=False, pointer=True)
-            self._gaze[eye_pos]['axes'] = vizshape.addAxes(scale=[0.1, 0.1, 0.1])
-            self._gaze[eye_pos]['axes'].visible(False)
+            self._gaze[eye_pos].data = False
+            self._gaze[eye_pos].node = None
+            self._gaze[eye_pos].visible = False
+            self._gaze[eye_pos].eye = Eyeball(visible=False, pointer=True)
+            self._gaze[eye_pos].axes = vizshape.addAxes(scale=[0.1, 0.1, 0.1])
+            self._gaze[eye_pos].axes.visible(False)
+            self._gaze[eye_pos].dir_fields = tuple('gaze{:s}_dir{:s}'.format(eye_pos, a) for a in 'XYZ')
+            self._gaze[eye_pos].pos_fields = tuple('gaze{:s}_pos{:s}'.format(eye_pos, a) for a in 'XYZ')
+
+            # Transform matrix reused each frame, scale is kept from each node type
+            self._gaze[eye_pos].mat = viz.Matrix()
+            self._gaze[eye_pos].scale = {'eye': self._gaze[eye_pos].eye.getScale(),
+                                         'axes': self._gaze[eye_pos].axes.getScale()}
 
         # Initial state of each eye visualization
         if eye not in ['LEFT_EYE', 'RIGHT_EYE', 'BOTH_EYE', 'BINOCULAR', None]:
             raise ValueError('Unknown eye parameter specified: {:s}'.format(eye))
         if eye == viz.LEFT_EYE or eye == 'LEFT_EYE':
             if eyeball:
-                self._gaze['L']['node'] = 'eye'
+                self._gaze['L'].node = 'eye'
             else:
-                self._gaze['L']['node'] = 'axes'
-            self._gaze['R']['node'] = None
-            self._gaze['']['node'] = None
+                self._gaze['L'].node = 'axes'
+            self._gaze['R'].node = None
+            self._gaze[''].node = None
 
         elif eye == viz.RIGHT_EYE or eye == 'RIGHT_EYE':
             if eyeball:
-                self._gaze['R']['node'] = 'eye'
+                self._gaze['R'].node = 'eye'
             else:
-                self._gaze['R']['node'] = 'axes'
-            self._gaze['L']['node'] = None
-            self._gaze['']['node'] = None
+                self._gaze['R'].node = 'axes'
+            self._gaze['L'].node = None
+            self._gaze[''].node = None
 
         elif eye == viz.BOTH_EYE == 'BOTH_EYE':
             if eyeball:
-                self._gaze['']['node'] = 'eye'
+                self._gaze[''].node = 'eye'
             else:
-                self._gaze['']['node'] = 'axes'
-            self._gaze['L']['node'] = None
-            self._gaze['R']['node'] = None
+                self._gaze[''].node = 'axes'
+            self._gaze['L'].node = None
+            self._gaze['R'].node = None
 
         elif eye == 'BINOCULAR':
             if eyeball:
-                self._gaze['L']['node'] = 'eye'
-                self._gaze['R']['node'] = 'eye'
+                self._gaze['L'].node = 'eye'
+                self._gaze['R'].node = 'eye'
             else:
-                self._gaze['L']['node'] = 'axes'
-                self._gaze['R']['node'] = 'axes'
-            self._gaze['']['node'] = None
+                self._gaze['L'].node = 'axes'
+                self._gaze['R'].node = 'axes'
+            self._gaze[''].node = None
 
         elif eye is None:
-            self._gaze['L']['node'] = None
-            self._gaze['R']['node'] = None
-            self._gaze['']['node'] = None
+            self._gaze['L'].node = None
+            self._gaze['R'].node = None
+            self._gaze[''].node = None
 
         # Set eyes to easy to distinguish colors by default
         self.setEyeColors(combined='brown', left='green', right='blue')
 
         self._frame = 0
-        self._samples = []
-        self._sample_time_offset = 0.0
+        self._set_columns({}, 0)
         self._player = None
         self.replaying = False
         self.finished = False
         self.console = console
+        self._console_buf = []
         self.replay_view = replay_view
 
         self.replay_nodes = []
@@ -114,13 +247,13 @@ class SampleReplay(object):
             self._ui.addSeparator()
 
             self._ui.addItem(viz.addText('Gaze Data'))
-            self._gaze['']['ui'] = self._ui.addLabelItem('Combined', viz.addDropList())
-            self._gaze['L']['ui'] = self._ui.addLabelItem('Left', viz.addDropList())
-            self._gaze['R']['ui'] = self._ui.addLabelItem('Right', viz.addDropList())
+            self._gaze[''].ui = self._ui.addLabelItem('Combined', viz.addDropList())
+            self._gaze['L'].ui = self._ui.addLabelItem('Left', viz.addDropList())
+            self._gaze['R'].ui = self._ui.addLabelItem('Right', viz.addDropList())
             for eye_pos in ['L', 'R', '']:
-                self._gaze[eye_pos]['ui'].setLength(0.6)
-                self._gaze[eye_pos]['ui'].addItems(['not shown', 'Eyeball', 'Axes'])
-                vizact.onlist(self._gaze[eye_pos]['ui'], self._ui_set_gaze)
+                self._gaze[eye_pos].ui.setLength(0.6)
+                self._gaze[eye_pos].ui.addItems(['not shown', 'Eyeball', 'Axes'])
+                vizact.onlist(self._gaze[eye_pos].ui, self._ui_set_gaze)
             self._ui.addSeparator()
 
             self._ui.addItem(viz.addText('Display Nodes'))
@@ -133,7 +266,8 @@ class SampleReplay(object):
         # Load recording
         if recording is not None:
             if type(recording) == SampleRecorder:
-                self._samples = recording._samples
+                columns = recording.getLastRecording(clear=False)[0]
+                self._set_columns(columns, len(columns.get('time', [])))
             else:
                 try:
                     self.loadRecording(recording)
@@ -145,18 +279,18 @@ class SampleReplay(object):
         """ Update GUI elements to display status (if enabled) """
         if self._ui is not None:
 
-            if len(self._samples) == 0:
+            if self._n_samples == 0:
                 self._ui_bar.message('No data')
             
-            elif self._frame < len(self._samples):
-                self._ui_bar.set(float(self._frame)/float(len(self._samples)))
-                self._ui_bar.message('{:d}/{:d}'.format(self._frame+1, len(self._samples)))
+            elif self._frame < self._n_samples:
+                self._ui_bar.set(float(self._frame)/float(self._n_samples))
+                self._ui_bar.message('{:d}/{:d}'.format(self._frame+1, self._n_samples))
 
-                t = self._samples[self._frame]['time'] - self._sample_time_offset
-                if t > 10000:
-                    self._ui_time.message('{:.1f} s'.format(t/1000.0))
+                t = self._rel_time[self._frame]
+                if t > 10.0:
+                    self._ui_time.message('{:.1f} s'.format(t))
                 else:
-                    self._ui_time.message('{:.1f} ms'.format(t))
+                    self._ui_time.message('{:.1f} ms'.format(t * 1000.0))
             
             if self.replaying and self._ui_play.getMessage() != 'Pause Replay':
                 self._ui_play.message('Pause Replay')
@@ -164,6 +298,46 @@ class SampleReplay(object):
                 self._ui_play.message('Start Replay')
 
 
+    def _flush_console(self):
+        """ Write buffered console output of replayed frames """
+        if len(self._console_buf) > 0:
+            sys.stdout.write('\n'.join(self._console_buf) + '\n')
+            del self._console_buf[:]
+
+
+    def _set_columns(self, columns, length, time_offset=0.0):
+        """ Replace replay sample data with a new set of data columns 
+        
+        Args:
+            columns (dict): Lists of sample values, keyed by field name
+            length (int): Number of samples in each column
+            time_offset (float): Sample time (ms) subtracted for displayed replay time
+        """
+        self._columns = columns
+        self._n_samples = length
+
+        # Replay time in s relative to time_offset, computed once for all samples
+        self._sample_time_offset = time_offset
+        self._rel_time = array.array('d', [(t - time_offset) / 1000.0 for t in columns.get('time', [])])
+
+        # Look up data columns for replayed eyes and viewpoint once
+        for eye_pos in list(self._gaze.keys()):
+            self._gaze[eye_pos].dir_cols = self._get_columns(self._gaze[eye_pos].dir_fields)
+            self._gaze[eye_pos].pos_cols = self._get_columns(self._gaze[eye_pos].pos_fields)
+            self._gaze[eye_pos].last = None
+        self._view_dir_cols = self._get_columns(VIEW_DIR_FIELDS)
+        self._view_pos_cols = self._get_columns(VIEW_POS_FIELDS)
+        self._console_cols = self._get_columns(CONSOLE_FIELDS)
+
+
+    def _get_columns(self, fields):
+        """ Return a tuple of sample data columns for the given field names,
+        or None if any of the fields is not present in the current recording """
+        if all([f in self._columns for f in fields]):
+            return tuple([self._columns[f] for f in fields])
+        return None
+
+
     def _ui_set_node_visibility(self, node):
         """ Callback for node visibility checkboxes """
         check = self._nodes[node]['ui'].get()
@@ -182,22 +356,23 @@ class SampleReplay(object):
     def _ui_set_gaze(self, event):
         """ Callback for gaze dropdown list """
         for eye_pos in ['L', 'R', '']:
-            if event.object == self._gaze[eye_pos]['ui']:
-                self._gaze[eye_pos]['eye'].visible(False)
-                self._gaze[eye_pos]['axes'].visible(False)
+            if event.object == self._gaze[eye_pos].ui:
+                self._gaze[eye_pos].eye.visible(False)
+                self._gaze[eye_pos].axes.visible(False)
                 if event.newSel == 1:
-                    self._gaze[eye_pos]['node'] = 'eye'
-                    self._gaze[eye_pos]['eye'].visible(True)
+                    self._gaze[eye_pos].node = 'eye'
+                    self._gaze[eye_pos].eye.visible(True)
                 elif event.newSel == 2:
-                    self._gaze[eye_pos]['node'] = 'axes'
-                    self._gaze[eye_pos]['axes'].visible(True)
+                    self._gaze[eye_pos].node = 'axes'
+                    self._gaze[eye_pos].axes.visible(True)
                 else:
-                    self._gaze[eye_pos]['node'] = None
+                    self._gaze[eye_pos].node = None
+                self._gaze[eye_pos].visible = self._gaze[eye_pos].node is not None
 
 
     def _ui_set_frame(self, slider_pos):
         """ Callback for progress bar click -> set current frame """
-        self._frame = int(slider_pos * len(self._samples))
+        self._frame = int(slider_pos * self._n_samples)
         self._set_ui()
 
 
@@ -210,17 +385,20 @@ class SampleReplay(object):
             for node in self._nodes.keys():
                 self._nodes[node]['ui'].remove()
         self._nodes = {}
+        n_colored = 0
 
         for node in self.replay_nodes:
             self._nodes[node] = {'visible': True}
+            self._nodes[node]['fields'] = tuple('{:s}_pos{:s}'.format(node, a) for a in 'XYZ')
+            self._nodes[node]['cols'] = self._get_columns(self._nodes[node]['fields'])
+            self._nodes[node]['last'] = None
             if node in COLORS:
                 # Consistent colors for built-in nodes
                 self._nodes[node]['color'] = COLORS[node]
             else:
-                # Generate a random color
-                self._nodes[node]['color'] = colorsys.hsv_to_rgb(random.uniform(0.0, 1.0), 
-                                                                 random.uniform(0.4, 1.0), 
-                                                                 random.uniform(0.5, 1.0))
+                # Next color from the palette
+                self._nodes[node]['color'] = _NODE_PALETTE[n_colored % len(_NODE_PALETTE)]
+                n_colored += 1
             if node == 'view':
                 self._nodes[node]['obj'] = vizshape.addAxes(scale=[0.1, 0.1, 0.1], color=self._nodes[node]['color'])
             else:
@@ -235,16 +413,16 @@ class SampleReplay(object):
 
         # Enable / disable gaze settings based on data availability
         for eye_pos in list(self._gaze.keys()):
-            if self._gaze[eye_pos]['data']:
-                self._gaze[eye_pos]['ui'].enable()
-                if self._gaze[eye_pos]['node'] is None:
-                    self._gaze[eye_pos]['ui'].select(0)
-                elif self._gaze[eye_pos]['node'] == 'eye':
-                    self._gaze[eye_pos]['ui'].select(1)
-                elif self._gaze[eye_pos]['node'] == 'axes':
-                    self._gaze[eye_pos]['ui'].select(2)
+            if self._gaze[eye_pos].data:
+                self._gaze[eye_pos].ui.enable()
+                if self._gaze[eye_pos].node is None:
+                    self._gaze[eye_pos].ui.select(0)
+                elif self._gaze[eye_pos].node == 'eye':
+                    self._gaze[eye_pos].ui.select(1)
+                elif self._gaze[eye_pos].node == 'axes':
+                    self._gaze[eye_pos].ui.select(2)
             else:
-                self._gaze[eye_pos]['ui'].disable()
+                self._gaze[eye_pos].ui.disable()
 
 
     def loadRecording(self, sample_file=None, sep='\t'):
@@ -255,45 +433,61 @@ class SampleReplay(object):
                 file is specified, show Vizard file selection dialog.
             sep (str): Field separator in CSV input file
         """
-        s = []
-
         if sample_file is None:
             sample_file = vizinput.fileOpen(filter=[('Samples files', '*.csv;*.tsv;*.dat;*.txt')])
 
         with open(sample_file, 'r') as sf:
-            reader = csv.DictReader(sf, delimiter=sep)
-            if len(reader.fieldnames) == 1:
+            HEADER = next(csv.reader([sf.readline()], delimiter=sep))
+            if len(HEADER) == 1:
                 m = 'Warning: Only a single column read from recording file. Is the field separator set correctly (e.g., sep=";")?\n'
                 print(m)
 
-            HEADER = reader.fieldnames
-            for row in reader:
-                sample = {}
-                for field in reader.fieldnames:
-
-                    # Convert numeric values
-                    data = row[field]
-                    try:
-                        sample[field] = int(data)
-                    except ValueError:
-                        try:
-                            sample[field] = float(data)
-                        except ValueError:
-                            sample[field] = data
-                s.append(sample)
-
-        self._samples = s
-        self._sample_time_offset = s[0]['time']
+            # Read file line by line, appending fields directly to their column.
+            # Only lines containing quoted fields need to go through the csv module.
+            # Fields are converted in chunks to limit memory use for long recordings.
+            data_columns = [[] for field in HEADER]
+            column_types = [None] * len(HEADER)
+            raw_columns = [[] for field in HEADER]
+            appenders = [col.append for col in raw_columns]
+            n_fields = len(HEADER)
+            n_samples = 0
+            n_skipped = 0
+            for line in sf:
+                line = line.rstrip('\r\n')
+                if not line:
+                    continue
+                if '"' in line:
+                    values = next(csv.reader([line], delimiter=sep))
+                else:
+                    values = line.split(sep)
+                if len(values) != n_fields:
+                    # Incomplete line, e.g. end of a streamed recording
+                    n_skipped += 1
+                    continue
+                for append, data in zip(appenders, values):
+                    append(data)
+                n_samples += 1
+                if n_samples % LOAD_CHUNK_SIZE == 0:
+                    _convert_chunk(data_columns, raw_columns, column_types)
+            _convert_chunk(data_columns, raw_columns, column_types)
+
+        if n_skipped > 0:
+            print('Warning: Skipped {:d} incomplete line(s) in recording file.'.format(n_skipped))
+        if n_samples == 0:
+            raise ValueError('No complete samples found in recording file {:s}.'.format(sample_file))
+
+        columns = dict(zip(HEADER, data_columns))
+        self._set_columns(columns, n_samples, time_offset=columns['time'][0])
 
         # Only enable gaze data present in the recording
         for eye_pos in list(self._gaze.keys()):
-            self._gaze[eye_pos]['data'] = False
+            self._gaze[eye_pos].data = False
         if 'gaze_posX' in HEADER and 'gaze_dirX' in HEADER:
-            self._gaze['']['data'] = True
+            self._gaze[''].data = True
         if 'gazeL_posX' in HEADER and 'gazeL_dirX' in HEADER:
-            self._gaze['L']['data'] = True
+            self._gaze['L'].data = True
         if 'gazeR_posX' in HEADER and 'gazeR_dirX' in HEADER:
-            self._gaze['R']['data'] = True
+            self._gaze['R'].data = True
 
         # Find tracked nodes
         _nodes_builtin = ['gaze', 'gazeL', 'gazeR', 'tracker', 'trackerL', 'trackerR']
@@ -302,18 +496,23 @@ class SampleReplay(object):
                 self.replay_nodes.append(field[0:-5])
         self._update_nodes()
         self._set_ui()
-        print('* Loaded {:d} replay samples from {:s}.'.format(len(s), sample_file))
+        print('* Loaded {:d} replay samples from {:s}.'.format(n_samples, sample_file))
         if len(self.replay_nodes) > 1:
             print('* Replay contains {:d} tracked nodes: {:s}.'.format(len(self.replay_nodes), ', '.join(self.replay_nodes)))
 
 
     def startReplay(self, from_start=True):
         """ Play the current recording frame by frame 
+
+        One recorded sample is shown per displayed frame, so that each frame 
+        shows exactly the recorded data (no interpolation between samples). 
+        Replay speed therefore matches the original recording only if display 
+        frame rate is the same as during recording.
         
         Args:
             from_start (bool): if True, start replay from first frame 
         """
-        if from_start or self._frame >= len(self._samples):
+        if from_start or self._frame >= self._n_samples:
             self._frame = 0
         if self._player is None:
             self._player = vizact.onupdate(0, self.replayCurrentFrame)
@@ -331,6 +530,7 @@ class SampleReplay(object):
             if self._player is not None:
                 self._player.setEnabled(False)
             self.replaying = False
+            self._flush_console()
             print('Replay stopped at frame {:d}.'.format(self._frame))
             self._set_ui()
 
@@ -349,43 +549,58 @@ class SampleReplay(object):
         Args:
             advance (bool): if True, advance to next frame (default).
         """
-        if self._frame < len(self._samples):
-            f = self._samples[self._frame]
+        if self._frame < self._n_samples:
+            i = self._frame
 
             # Set up eye representation(s)
-            for eye_pos in list(self._gaze.keys()):
-                if self._gaze[eye_pos]['node'] is not None:
-                    if self._gaze[eye_pos]['data']:
-                        node = self._gaze[eye_pos][self._gaze[eye_pos]['node']]
-                        eye_mat = viz.Matrix()
-                        eye_mat.setEuler([f['gaze{:s}_dirX'.format(eye_pos)],
-                                        f['gaze{:s}_dirY'.format(eye_pos)],
-                                        f['gaze{:s}_dirZ'.format(eye_pos)]])
-                        eye_mat.setPosition([f['gaze{:s}_posX'.format(eye_pos)],
-                                            f['gaze{:s}_posY'.format(eye_pos)],
-                                            f['gaze{:s}_posZ'.format(eye_pos)]])
-                        eye_mat.setScale(node.getScale())
-                        node.setMatrix(eye_mat)
-                        node.visible(True)
-                    else:
-                        self._gaze[eye_pos][self._gaze[eye_pos]['node']].visible(False) 
+            for gaze in self._gaze.values():
+                kind = gaze.node
+                if kind is not None:
+                    node = getattr(gaze, kind)
+                    if gaze.data:
+                        gaze_dir = [col[i] for col in gaze.dir_cols]
+                        gaze_pos = [col[i] for col in gaze.pos_cols]
+
+                        # Only update eye transform if node or data changed
+                        last = gaze.last
+                        if (last is None or last[0] != kind or _changed(last[1], gaze_dir, REPLAY_TOL_DIR)
+                            or _changed(last[2], gaze_pos, REPLAY_TOL_POS)):
+                            eye_mat = gaze.mat
+                            eye_mat.makeIdent()
+                            eye_mat.setEuler(gaze_dir)
+                            eye_mat.setPosition(gaze_pos)
+                            eye_mat.setScale(gaze.scale[kind])
+                            node.setMatrix(eye_mat)
+                            gaze.last = (kind, gaze_dir, gaze_pos)
+
+                    # Only show or hide eye node when data availability changes
+                    if gaze.visible != gaze.data:
+                        node.visible(gaze.data)
+                        gaze.visible = gaze.data
 
             # Position the 3D gaze cursor and other nodes
-            for node in self._nodes.keys():
-                if self._nodes[node]['visible']:
-                    self._nodes[node]['obj'].setPosition([f['{:s}_posX'.format(node)], f['{:s}_posY'.format(node)], f['{:s}_posZ'.format(node)]])
-
-            if self.replay_view:
-                viz.MainView.setEuler([f['view_dirX'], f['view_dirY'], f['view_dirZ']])
-                viz.MainView.setPosition([f['view_posX'], f['view_posY'], f['view_posZ']])
+            for node in self._nodes.values():
+                if node['visible']:
+                    pos = [col[i] for col in node['cols']]
+                    last = node['last']
+                    if last is None or _changed(last, pos, REPLAY_TOL_POS):
+                        node['obj'].setPosition(pos)
+                        node['last'] = pos
+
+            if self.replay_view and self._view_dir_cols is not None and self._view_pos_cols is not None:
+                viz.MainView.setEuler([col[i] for col in self._view_dir_cols])
+                viz.MainView.setPosition([col[i] for col in self._view_pos_cols])
 
             if self.console:
-                st = 't={:.2f}s, f={:d}\tgaze3d=[{:0.2f}, {:0.2f}, {:0.2f}]\tgaze=[{:0.2f}, {:0.2f}, {:0.2f}]'
-                print(st.format((f['time'] - self._sample_time_offset)/1000.0, self._frame, f['gaze3d_posX'], f['gaze3d_posY'], f['gaze3d_posZ'], f['gaze_dirX'], f['gaze_dirY'], f['gaze_dirZ']))
+                line = CONSOLE_LINE.format(self._rel_time[i], self._frame)
+                if self._console_cols is not None:
+                    line += CONSOLE_GAZE.format(*map(itemgetter(i), self._console_cols))
+                self._console_buf.append(line)
+                if len(self._console_buf) >= CONSOLE_FLUSH_FRAMES or not self.replaying:
+                    self._flush_console()
             else:
-                if self._frame == 0 or self._frame == len(self._samples) or self._frame % 100 == 0:
-                    print('Replaying frame {:d}/{:d}, t={:.1f} s'.format(self._frame, len(self._samples), 
-                                                                    (f['time'] - self._sample_time_offset)/1000.0))
+                if self._frame == 0 or self._frame == self._n_samples or self._frame % 100 == 0:
+                    print('Replaying frame {:d}/{:d}, t={:.1f} s'.format(self._frame, self._n_samples, self._rel_time[i]))
 
             if advance:
                 self._frame += 1
@@ -396,9 +611,12 @@ class SampleReplay(object):
             self.finished = True
             if self._player is not None:
                 self._player.setEnabled(False)
+            self._flush_console()
             print('Replay finished.')
 
-        self._set_ui()
+        # Status GUI does not need to follow every replayed frame
+        if not self.replaying or self._frame % UI_UPDATE_FRAMES == 0:
+            self._set_ui()
 
         
     def replayDone(self):
@@ -442,11 +660,11 @@ class SampleReplay(object):
             right: As 'combined', but for right eye
         """
         if combined is not None:
-            self._gaze['']['eye'].setEyeColor(combined)
+            self._gaze[''].eye.setEyeColor(combined)
         if left is not None:
-            self._gaze['L']['eye'].setEyeColor(left)
+            self._gaze['L'].eye.setEyeColor(left)
         if right is not None:
-            self._gaze['R']['eye'].setEyeColor(right)
+            self._gaze['R'].eye.setEyeColor(right)
         
 
 
@@ -1,24 +1,45 @@
 # -*- coding: utf-8 -*-
 
 # vexptoolbox: Vizard Toolbox for Behavioral Experiments
-# Statistics helper functions that work without numpy/scipy installed
+# Statistics helper functions that work without numpy/scipy installed,
+# but use numpy for faster computation if available
 
 import math
 
+try:
+    # numpy is used to speed up calculations on long sample lists if it 
+    # is installed, otherwise the pure Python versions below are used.
+    import numpy as np
+    _HAS_NUMPY = True
+
+except ImportError:
+    _HAS_NUMPY = False
+
+
 def mean(x):
-    """ Calculate Arithmetic Mean without using numpy """
+    """ Calculate Arithmetic Mean """
+    if _HAS_NUMPY:
+        return float(np.mean(np.asarray(x, dtype=np.float64)))
     return sum([float(a) for a in x]) / float(len(x))
 
 
 def sd(x):
-    """ Calculate population Standard Deviation without numpy """
+    """ Calculate population Standard Deviation """
+    if _HAS_NUMPY:
+        return float(np.std(np.asarray(x, dtype=np.float64)))
     xm = mean(x)
     return math.sqrt(sum([(float(xi) - xm)**2 for xi in x]) / float(len(x)))
 
 
 def median(x):
-    """ Calculate sample Median without using numpy """
-    x = sorted(x)
+    """ Calculate sample Median """
+    if _HAS_NUMPY:
+        return float(np.median(np.asarray(x, dtype=np.float64)))
+    return _median_sorted(sorted(x))
+
+
+def _median_sorted(x):
+    """ Median of an already sorted list of samples """
     m = int(len(x) / 2.0)
     if len(x) % 2 == 0:		
         return (x[m] + x[m-1]) / 2.0
@@ -29,19 +50,30 @@ def median(x):
 def rmsi(x):
     """ Calculate intersample Root Mean Square (RMS) error (precision) 
     see also Holmqvist, Nyström & Mulvey, 2012, ETRA """
+    if _HAS_NUMPY:
+        return float(np.sqrt(np.mean(np.diff(np.asarray(x, dtype=np.float64)) ** 2)))
     dsq = [(float(x[t])-float(x[t-1]))**2 for t in range(1, len(x))]
     return math.sqrt(sum(dsq) / len(dsq))
 
 
 def rmsm(x):
     """ Calculate 1D RMS error between samples and the sample mean """
+    if _HAS_NUMPY:
+        a = np.asarray(x, dtype=np.float64)
+        return float(np.sqrt(np.mean((a - a.mean()) ** 2)))
     xm = mean(x)
-    dsq = [(float(x[t])-xm)**2 + (float(y[t])-ym)**2 + (float(z[t])-zm)**2 for xi in x]
+    dsq = [(float(xi)-xm)**2 for xi in x]
     return math.sqrt(sum(dsq) / len(dsq))
 
 
 def rmsm3(x, y, z):
     """ Calculate 3D RMS error between samples and the sample mean """	
+    if _HAS_NUMPY:
+        a = np.asarray(x, dtype=np.float64)
+        b = np.asarray(y, dtype=np.float64)
+        c = np.asarray(z, dtype=np.float64)
+        dsq = (a - a.mean()) ** 2 + (b - b.mean()) ** 2 + (c - c.mean()) ** 2
+        return float(np.sqrt(dsq.mean()))
     xm = mean(x)
     ym = mean(y)
     zm = mean(z)
@@ -53,8 +85,18 @@ def mad(x):
     """ Calculate Median Absolute Deviation (MAD) of samples (precision)
     see also Lohr, Friedman & Komogortsev, 2019, arXiv.
     """
-    medx = median(x)
-    return median([abs(xi - medx) for xi in x])
+    if _HAS_NUMPY:
+        # Work on a private copy so both medians can partition in-place
+        a = np.array(x, dtype=np.float64)
+        a -= np.median(a, overwrite_input=True)
+        np.abs(a, out=a)
+        return float(np.median(a, overwrite_input=True))
+
+    # Deviations from the median of sorted samples form one descending and
+    # one ascending run, which sorted() merges in linear time
+    xs = sorted(x)
+    medx = _median_sorted(xs)
+    return _median_sorted(sorted([abs(xi - medx) for xi in xs]))
 
 
 def mad2(x, y):
@@ -62,6 +104,4 @@ def mad2(x, y):
     2D version used for horizontal and vertical gaze angles. See also 
     Lohr, Friedman & Komogortsev, 2019, arXiv.
     """
-    medx = median(x)
-    medy = median(y)
-    return math.sqrt((median([abs(xi - medx) for xi in x]) ** 2) + (median([abs(yi - medy) for yi in y]) ** 2))
+    return math.sqrt((mad(x) ** 2) + (mad(y) ** 2))
@@ -14,6 +14,22 @@ import vizinfo
 import viztask
 
 
+# Head-locked text nodes used by showVRText / waitVRText that are currently not
+# displayed, by text type (3D text: True). Nodes are hidden and kept here
+# for reuse instead of being removed.
+_vr_text_pool = {True: [], False: []}
+
+# Default head-locked text color (white) and shared fade-out actions by duration
+_DEFAULT_COLOR = (1.0, 1.0, 1.0)
+_fadeout_actions = {0.7: vizact.fadeTo(0, time=0.7)}
+
+# Characters rendered once by preloadVRText() to populate the glyph cache
+VR_TEXT_PRELOAD_CHARS = ' abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,:;!?-()'
+
+# Render order of flat showVRText / waitVRText messages (drawn after the scene)
+VR_TEXT_DRAW_ORDER = 1000
+
+
 class ObjectCollection(dict):
     """ Holds multiple node objects, similar to a Unity tag. 
     Each node can belong to more than one ObjectCollection. """
@@ -207,70 +223,188 @@ def steamVREasySetup(link_models=True, mono_mirror=True):
         return (None, None)
 
 
-def showVRText(msg='Text', color=[1.0, 1.0, 1.0], distance=2.0, scale=0.05, duration=3.0):
+def showVRText(msg='Text', color=None, distance=2.0, scale=0.05, duration=3.0, use_3d=False, fade=0.7):
     """ Display head-locked message in VR for specified duration.
     
     Args:
         msg (str): Message text
-        color: RBG 3-tuple of color values
+        color: RBG 3-tuple of color values (default: white)
         distance (float): Z rendering distance from MainView
         scale (float): Text node scaling factor
         duration (float): Message display duration (seconds)
-    """
-    text = addHeadLockedText(msg=msg,
-                             color=color,
-                             distance=distance,
-                             scale=scale)
+        use_3d (bool): if True, use extruded 3D text instead of flat text
+        fade (float): Fade-out duration (seconds), 0 to hide immediately
+
+    The text node is set up immediately when this function is called, not 
+    when the returned task is first run by the scheduler, so the message 
+    becomes visible without an extra frame of delay.
     
-    # Fade text away after <duration> seconds
-    fadeout = vizact.fadeTo(0, time=0.7)
+    Returns: viztask generator that fades out and hides the message. Schedule 
+        it or yield it from a task to wait until the message is gone.
+    """
+    text = _get_vr_text(msg, color, distance, scale, use_3d)
+    return _showVRText_tail(text, duration, fade)
+
+
+def _showVRText_tail(text, duration, fade):
+    """ Fade text away after <duration> seconds, then release the text node """
     yield viztask.waitTime(duration)
-    text.addAction(fadeout)
-    yield viztask.waitActionEnd(text, fadeout)
-    text.remove()
+    if fade > 0:
+        fadeout = _get_fadeout(fade)
+        text.addAction(fadeout)
+        yield viztask.waitActionEnd(text, fadeout)
+    _release_vr_text(text)
+
+
+def _get_fadeout(fade):
+    """ Return a shared fade-out action of the given duration """
+    fadeout = _fadeout_actions.get(fade)
+    if fadeout is None:
+        fadeout = _fadeout_actions[fade] = vizact.fadeTo(0, time=fade)
+    return fadeout
+
+
+def showVRTextNoWait(msg='Text', color=None, distance=2.0, scale=0.05, duration=3.0, use_3d=False, fade=0.7):
+    """ Display head-locked message in VR for specified duration, without a task.
+
+    Same as showVRText(), but the fade-out is run by a vizact action sequence 
+    on the text node, so the call returns immediately and nothing needs to
+    be scheduled. Use this if the caller does not need to wait for the message.
+
+    Args:
+        msg (str): Message text
+        color: RBG 3-tuple of color values (default: white)
+        distance (float): Z rendering distance from MainView
+        scale (float): Text node scaling factor
+        duration (float): Message display duration (seconds)
+        use_3d (bool): if True, use extruded 3D text instead of flat text
+        fade (float): Fade-out duration (seconds), 0 to hide immediately
+    
+    Returns: Vizard text node. The node is reused for later messages 
+        once hidden, so do not keep references to it.
+    """
+    text = _get_vr_text(msg, color, distance, scale, use_3d)
+    actions = [vizact.waittime(duration)]
+    if fade > 0:
+        actions.append(_get_fadeout(fade))
+    actions.append(vizact.call(_release_vr_text, text))
+    text.addAction(vizact.sequence(actions))
+    return text
 
 
-def waitVRText(msg='Text', color=[1.0, 1.0, 1.0], distance=2.0, scale=0.05, keys=' ', controller=None):
+def waitVRText(msg='Text', color=None, distance=2.0, scale=0.05, keys=' ', controller=None, 
+               use_3d=False):
     """ Display head-locked message in VR and wait for key press.
     
     Args:
         msg (str): Message text
-        color: RBG 3-tuple of color values
+        color: RBG 3-tuple of color values (default: white)
         distance (float): Z rendering distance from MainView
         scale (float): Text node scaling factor
         keys (str): Key code(s) to dismiss message (see viztask.waitKeyDown)
         controller (sensor): Specify a controller sensor to also dismiss on button press
+        use_3d (bool): if True, use extruded 3D text instead of flat text
     
     Returns: Vizard keypress event
     """
-    text = addHeadLockedText(msg=msg,
-                             color=color,
-                             distance=distance,
-                             scale=scale)
+    text = _get_vr_text(msg, color, distance, scale, use_3d)
 
     if controller is not None:
         event = yield viztask.waitAny([viztask.waitKeyDown(keys), viztask.waitSensorDown(controller, None)])
     else:
         event = yield viztask.waitKeyDown(keys)
-    text.remove()
+    _release_vr_text(text)
     viztask.returnValue(event)
 
 
-def addHeadLockedText(msg='Text', color=[1.0, 1.0, 1.0], distance=2.0, scale=0.05):
+def _get_vr_text(msg, color, distance, scale, use_3d):
+    """ Return a head-locked text node for showVRText / waitVRText. 
+    Reuses a previously released node if available, otherwise creates a new one. """
+    if color is None:
+        color = _DEFAULT_COLOR
+    pool = _vr_text_pool[bool(use_3d)]
+    if len(pool) == 0:
+        return _new_vr_text(msg, color, distance, scale, use_3d)
+
+    text = pool.pop()
+    text.message(msg)
+    text.color(color)
+    if scale != text.text_scale:
+        text.setScale([scale, scale, scale])
+        text.text_scale = scale
+    text.alpha(1.0)
+    if distance != text.distance:
+        # Link operators only need to be rebuilt if the distance changed
+        text.link.reset(viz.RESET_OPERATORS)
+        text.link.preTrans([0.0, 0.0, distance])
+        text.distance = distance
+    text.visible(True)
+    return text
+
+
+def _new_vr_text(msg, color, distance, scale, use_3d):
+    """ Create a new head-locked text node that can be pooled by _release_vr_text() """
+    text = addHeadLockedText(msg=msg, color=color, distance=distance, scale=scale, use_3d=use_3d)
+
+    # Draw flat messages as an overlay after the scene, without depth buffer access.
+    # Extruded 3D text needs the depth test to render its glyph faces correctly.
+    if not use_3d:
+        text.disable(viz.DEPTH_TEST)
+        text.disable(viz.DEPTH_WRITE)
+        text.drawOrder(VR_TEXT_DRAW_ORDER)
+
+    text.use_3d = bool(use_3d)
+    text.distance = distance
+    text.text_scale = scale
+    return text
+
+
+def _release_vr_text(text):
+    """ Hide a text node obtained from _get_vr_text() and keep it for reuse """
+    text.visible(False)
+    _vr_text_pool[text.use_3d].append(text)
+
+
+def preloadVRText(count=1, use_3d=False, chars=VR_TEXT_PRELOAD_CHARS):
+    """ Create hidden text nodes for showVRText / waitVRText in advance.
+
+    Creating the first text node loads the font and builds its glyphs, which 
+    can cause a noticeable frame drop. Call this during experiment setup to 
+    avoid the stall when the first message is shown during a trial. 
+
+    Args:
+        count (int): Number of text nodes to create, i.e. number of
+            messages that can be displayed at the same time without delay
+        use_3d (bool): if True, preload extruded 3D text instead of flat text
+        chars (str): Characters to prepare font glyphs for
+    """
+    for n in range(0, count):
+        _release_vr_text(_new_vr_text(chars, None, 2.0, 0.05, use_3d))
+
+
+def addHeadLockedText(msg='Text', color=None, distance=2.0, scale=0.05, use_3d=True):
     """ Add a head-locked text node, e.g. to display task feedback in VR.
     
     Args:
         msg (str): Message text
-        color: RBG 3-tuple of color values
+        color: RBG 3-tuple of color values (default: white)
         distance (float): Z rendering distance from MainView
         scale (float): Text node scaling factor
+        use_3d (bool): if True, create extruded 3D text (Text3D), otherwise 
+            flat text rendered from a font texture, which is faster to create
     
     Returns: Vizard node3d object containing the text
     """
-    # Create 3D text object
-    text = viz.addText3D(msg, scale=[scale, scale, scale], color=color)
+    if color is None:
+        color = _DEFAULT_COLOR
+
+    # Create text object
+    if use_3d:
+        text = viz.addText3D(msg, scale=[scale, scale, scale], color=color)
+        text.setThickness(0.1)
+    else:
+        text = viz.addText(msg, scale=[scale, scale, scale], color=color)
     text.resolution(1.0)
-    text.setThickness(0.1)
     text.alignment(viz.ALIGN_CENTER)
     
     # Lock text to user viewpoint at fixed distance
@@ -281,6 +415,76 @@ def addHeadLockedText(msg='Text', color=[1.0, 1.0, 1.0], distance=2.0, scale=0.0
     return text
 
 
+class VRTextBatch(object):
+    """ Combine several head-locked messages into a single text node.
+
+    Messages are added as separate lines using add() and are shown 
+    together using one text node by calling show(), or automatically 
+    at the end of a with-block, e.g.:
+
+    with VRTextBatch(duration=2.0) as batch:
+        batch.add('Trial 3 of 20')
+        batch.add('Look at the target')
+
+    Args:
+        color: RBG 3-tuple of color values (default: white)
+        distance (float): Z rendering distance from MainView
+        scale (float): Text node scaling factor
+        duration (float): Message display duration (seconds)
+        use_3d (bool): if True, use extruded 3D text instead of flat text
+        fade (float): Fade-out duration (seconds), 0 to hide immediately
+    """
+    def __init__(self, color=None, distance=2.0, scale=0.05, duration=3.0, use_3d=False, fade=0.7):
+        self.color = color
+        self.distance = distance
+        self.scale = scale
+        self.duration = duration
+        self.use_3d = use_3d
+        self.fade = fade
+        self.lines = []
+        self.task = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.show()
+
+
+    def add(self, msg, row=None):
+        """ Add a line of text to the batch 
+        
+        Args:
+            msg (str): Message text
+            row (int): Line index to insert the message at. If None, 
+                the message is appended after the existing lines.
+        """
+        if row is None:
+            self.lines.append(msg)
+        else:
+            while len(self.lines) < row:
+                self.lines.append('')
+            self.lines.insert(row, msg)
+
+
+    def show(self):
+        """ Display all collected lines using a single head-locked text node.
+        Called automatically at the end of a with-block.
+
+        Returns: viztask.Task object that fades out and hides the message
+        """
+        if len(self.lines) == 0:
+            return None
+        text = _get_vr_text('\n'.join(self.lines), self.color, self.distance, 
+                            self.scale, self.use_3d)
+        self.lines = []
+        self.task = viztask.schedule(_showVRText_tail(text, self.duration, self.fade))
+        return self.task
+
+
 def waitVRInstruction(msg='Text', title='Title', force_str=False, 
                       distance=2.5, height=None, billboard=True,
                       resolution=(1920, 1080), size=(1.92, 1.08),